@@ -0,0 +1,64 @@
+# assets.py
+
+import os
+import pygame
+
+class AssetManager:
+    # Каждое изображение грузится с диска один раз и приводится к формату экрана.
+    # Поверхности общие: менять их на месте нельзя, только копировать.
+    def __init__(self):
+        self.images = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _optimise(self, image, alpha):
+        # Без окна конвертировать не во что
+        if pygame.display.get_surface() is None: return image
+        if alpha: return image.convert_alpha()
+        colorkey = image.get_colorkey()
+        if alpha is None and colorkey is None and image.get_masks()[3]: return image.convert_alpha()
+        image = image.convert()
+        # Прозрачный цвет-ключ: RLE-сжатие пропускает пустые пиксели при блите
+        if colorkey is not None: image.set_colorkey(colorkey, pygame.RLEACCEL)
+        return image
+
+    def load(self, path, fallback=None, alpha=None):
+        # alpha: None - по содержимому файла, True - всегда convert_alpha(), False - всегда convert()
+        key = (os.path.normpath(path), alpha)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        try:
+            image = self._optimise(pygame.image.load(path), alpha)
+        except (pygame.error, FileNotFoundError) as e:
+            if fallback is None: raise
+            print(f"Не удалось загрузить изображение {path}: {e}")
+            image = fallback()
+        self.images[key] = image
+        return image
+
+    def load_flipped(self, path, fallback=None, alpha=None):
+        key = (os.path.normpath(path), alpha, "flip_x")
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        image = pygame.transform.flip(self.load(path, fallback, alpha), True, False)
+        self.images[key] = image
+        return image
+
+    def clear(self):
+        self.images.clear()
+
+    def stats(self):
+        return {
+            "images": len(self.images),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": sum(image.get_pitch() * image.get_height() for image in self.images.values()),
+        }
+
+assets = AssetManager()
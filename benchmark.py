@@ -0,0 +1,220 @@
+# benchmark.py
+# Безголовый замер производительности: python benchmark.py --frames 3000 --output bench.json
+# Сравнение с сохранённым прогоном: python benchmark.py --baseline bench.json
+# Масштабирование: python benchmark.py --sweep melee=0,50,100,200 --plot sweep.png
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import pygame
+
+# Игра грузит ресурсы относительными путями
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+from main import App
+from game import Game, FIXED_DT
+from profiler import FrameProfiler
+from replay import InputReplay
+from statehash import StateHashWriter
+import mapgen
+
+PHASES = ["player", "enemies", "projectiles", "tiles", "collision", "ui",
+          "render_background", "render_tiles", "render_sprites", "render_ui", "render", "scale", "frame"]
+
+# Сценарий повторяется каждые SCRIPT_LENGTH кадров: (начало, конец, действие)
+SCRIPT_LENGTH = 1440
+HELD_SCRIPT = [
+    (0, 480, "move_right"),
+    (480, 600, "charge"),
+    (660, 1020, "move_left"),
+    (1020, 1140, "charge"),
+    (1140, 1440, "move_right"),
+]
+TAP_SCRIPT = {
+    "jump": 90,
+    "attack": 50,
+}
+
+class ScriptedKeys:
+    # Подменяет pygame.key.get_pressed() для Game.handle_input
+    def __init__(self, pressed):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+def scripted_input(frame, controls):
+    t = frame % SCRIPT_LENGTH
+    held = {controls[action] for start, end, action in HELD_SCRIPT if start <= t < end}
+    taps = [controls[action] for action, period in TAP_SCRIPT.items() if frame % period == period - 1]
+    return held, taps
+
+def run_benchmark(frames, warmup, seed, map_path="Rooms/map.tmx", integer_scale=False, replay_path=None, state_hash_path=None):
+    random.seed(seed)
+    app = App()
+    app.presenter.set_integer_scale(integer_scale)
+    # Запись ввода задаёт и карту, и зерно, и управление; кадр бенчмарка - один тик записи
+    replay = InputReplay.load(replay_path) if replay_path else None
+    if replay:
+        controls = replay.controls
+        map_path = replay.map_path
+        game = Game(app.game_surface, particles_enabled=replay.particles_enabled, map_path=map_path, seed=replay.seed, music_enabled=False)
+    else:
+        controls = app.settings_manager.get_controls()
+        game = Game(app.game_surface, particles_enabled=True, map_path=map_path, seed=seed, music_enabled=False)
+        game.ui.skip_intro()
+    profiler = FrameProfiler(enabled=True)
+    game.profiler = profiler
+    game.controls = controls
+    state_hasher = StateHashWriter(state_hash_path) if state_hash_path else None
+    loader = game.map_loader
+    entities = len(game.enemies) + sum(len(group) for group in [loader.collectables, loader.falling_tiles, loader.breakable_tiles, loader.healing_tiles])
+
+    for frame in range(warmup + frames):
+        if replay and replay.finished(): break
+        if frame == warmup: profiler.reset()
+        with profiler.section("frame"):
+            if replay:
+                events, keys = replay.next_tick()
+                for event in events: game.handle_event(event)
+                game.handle_input(controls, keys)
+            else:
+                held, taps = scripted_input(frame, controls)
+                for key in taps:
+                    game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=key))
+                game.handle_input(controls, ScriptedKeys(held))
+            game.update(FIXED_DT)
+            if state_hasher: state_hasher.record(game)
+            with profiler.section("render"):
+                game.render()
+            app._render_surface()
+            profiler.add_sample("scale", app.presenter.last_cost_ms / 1000)
+        profiler.end_frame()
+        pygame.event.pump()
+
+        if game.game_over and not replay:
+            game.reset_game()
+            game.ui.skip_intro()
+
+    if state_hasher: state_hasher.close()
+    summary = profiler.summary()
+    return {
+        "map": map_path,
+        "replay": replay_path,
+        "frames": len(profiler.frames),
+        "seed": seed,
+        "scale_mode": app.presenter.mode,
+        "display_size": list(app.presenter.display_size),
+        "enemies": len(game.enemies),
+        "entities": entities,
+        "phases": {name: summary[name] for name in PHASES if name in summary},
+    }
+
+def compare(result, baseline, tolerance, noise_floor_ms=0.05):
+    regressions = []
+    for name, stats in result["phases"].items():
+        base = baseline.get("phases", {}).get(name)
+        if not base: continue
+        for metric in ("mean_ms", "p95_ms", "p99_ms"):
+            limit = base[metric] * (1 + tolerance)
+            if stats[metric] > limit and stats[metric] - base[metric] > noise_floor_ms:
+                regressions.append(f"{name}.{metric}: {base[metric]:.3f} -> {stats[metric]:.3f} ms (+{(stats[metric] / base[metric] - 1) * 100 if base[metric] else 0:.1f}%)")
+    return regressions
+
+def parse_sweep(text):
+    # "melee=0,50,100" -> ("melee", [0, 50, 100]) с типом из mapgen.DEFAULTS
+    name, values = text.split("=", 1)
+    if name not in mapgen.DEFAULTS: raise SystemExit(f"--sweep: неизвестный параметр {name}, есть: {', '.join(mapgen.DEFAULTS)}")
+    cast = type(mapgen.DEFAULTS[name])
+    return name, [cast(value) for value in values.split(",")]
+
+def run_sweep(name, values, frames, warmup, seed):
+    results = []
+    with tempfile.TemporaryDirectory() as map_dir:
+        for value in values:
+            map_path = mapgen.write_tmx(os.path.join(map_dir, f"sweep_{name}_{value}.tmx"), **{"seed": seed, name: value})
+            result = run_benchmark(frames, warmup, seed, map_path)
+            result["sweep"] = {name: value}
+            results.append(result)
+            frame = result["phases"].get("frame", {})
+            print(f"{name}={value}: {result['entities']} entities, frame mean {frame.get('mean_ms', 0):.3f} ms, p95 {frame.get('p95_ms', 0):.3f} ms", file=sys.stderr)
+    return results
+
+def plot_sweep(results, path, phase="frame", size=(640, 400)):
+    # Время кадра (среднее и p95) от числа сущностей на карте
+    surface = pygame.Surface(size)
+    surface.fill((255, 255, 255))
+    font = pygame.font.Font(None, 18)
+    left, top, right, bottom = 60, 30, size[0] - 20, size[1] - 40
+    pygame.draw.line(surface, (0, 0, 0), (left, bottom), (right, bottom))
+    pygame.draw.line(surface, (0, 0, 0), (left, top), (left, bottom))
+
+    points = [(result["entities"], result["phases"].get(phase, {})) for result in results]
+    max_x = max([x for x, _ in points] + [1])
+    max_y = max([stats.get("p95_ms", 0) for _, stats in points] + [0.001])
+    def to_screen(x, y): return (left + (right - left) * x / max_x, bottom - (bottom - top) * y / max_y)
+
+    for metric, color in (("mean_ms", (40, 90, 200)), ("p95_ms", (210, 60, 60))):
+        line = [to_screen(x, stats.get(metric, 0)) for x, stats in points]
+        if len(line) > 1: pygame.draw.lines(surface, color, False, line, 2)
+        for point in line: pygame.draw.circle(surface, color, point, 3)
+        surface.blit(font.render(metric, True, color), (right - 60, top + (0 if metric == "mean_ms" else 16)))
+
+    surface.blit(font.render(f"{phase} ms (max {max_y:.2f})", True, (0, 0, 0)), (left, 8))
+    surface.blit(font.render(f"entities (max {max_x})", True, (0, 0, 0)), (right - 140, bottom + 12))
+    pygame.image.save(surface, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Безголовый бенчмарк Game.update/Game.render")
+    parser.add_argument("--frames", type=int, default=3000, help="сколько кадров замерять")
+    parser.add_argument("--warmup", type=int, default=120, help="кадры прогрева, не попадают в статистику")
+    parser.add_argument("--seed", type=int, default=1, help="зерно для random")
+    parser.add_argument("--map", default="Rooms/map.tmx", help="карта TMX")
+    parser.add_argument("--integer-scale", action="store_true", help="масштабировать только в целое число раз")
+    parser.add_argument("--replay", help="брать ввод из записи (main.py --record) вместо встроенного сценария")
+    parser.add_argument("--hash-state", help="писать хэш состояния на каждом тике (сравнение: statehash.py)")
+    parser.add_argument("--sweep", help="перебор параметра генератора карт, например melee=0,50,100")
+    parser.add_argument("--plot", help="PNG с графиком времени кадра от числа сущностей (для --sweep)")
+    parser.add_argument("--output", help="куда записать JSON (по умолчанию stdout)")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="допустимое замедление, доля")
+    args = parser.parse_args()
+
+    if args.sweep:
+        name, values = parse_sweep(args.sweep)
+        results = run_sweep(name, values, args.frames, args.warmup, args.seed)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, "w") as f: f.write(text + "\n")
+        else:
+            print(text)
+        if args.plot: plot_sweep(results, args.plot)
+        pygame.quit()
+        return
+
+    result = run_benchmark(args.frames, args.warmup, args.seed, args.map, args.integer_scale, args.replay, args.hash_state)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f: f.write(text + "\n")
+    else:
+        print(text)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions: print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions: exit_code = 1
+        else: print("OK: no regressions against baseline", file=sys.stderr)
+
+    pygame.quit()
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,11 @@ class MegaManCamera:
         self.world_height = world_height
         self.current_x = 0
         self.current_y = 0
+        # Позиция на прошлом шаге симуляции и интерполированная позиция для отрисовки
+        self.previous_x = 0
+        self.previous_y = 0
+        self.view_x = 0
+        self.view_y = 0
         self.target_x = 0
         self.target_y = 0
         self.screen_width = LOGICAL_WIDTH
@@ -56,8 +61,19 @@ class MegaManCamera:
             self.current_x = self.start_x + (self.target_x - self.start_x) * t
             self.current_y = self.start_y + (self.target_y - self.start_y) * t
 
+        self.view_x = self.current_x
+        self.view_y = self.current_y
+
+    def store_previous(self):
+        self.previous_x = self.view_x = self.current_x
+        self.previous_y = self.view_y = self.current_y
+
+    def interpolate(self, alpha):
+        self.view_x = self.previous_x + (self.current_x - self.previous_x) * alpha
+        self.view_y = self.previous_y + (self.current_y - self.previous_y) * alpha
+
     def apply(self, rect):
-        return rect.move(-self.current_x + self.x_offset, -self.current_y)
+        return rect.move(-self.view_x + self.x_offset, -self.view_y)
 
     def get_world_rect(self):
         return pygame.Rect(self.current_x, self.current_y, self.screen_width, self.screen_height)
@@ -70,12 +86,32 @@ class MegaManCamera:
         clamped_y = max(0, min(y, self.world_height - self.screen_height))
         self.current_x = clamped_x
         self.current_y = clamped_y
+        self.previous_x = self.view_x = clamped_x
+        self.previous_y = self.view_y = clamped_y
         self.target_x = clamped_x
         self.target_y = clamped_y
         self.moving = False
         self.animation_progress = 1
 
+    def get_view_rect(self):
+        # Видимая область в пределах физического экрана, а не логического
+        return pygame.Rect(self.view_x - self.x_offset, self.view_y, self.physical_width, self.screen_height)
+
     def is_in_camera_view(self, rect):
-        # Проверяем видимость в пределах физического экрана, а не логического
-        camera_world_rect = pygame.Rect(self.current_x - self.x_offset, self.current_y, self.physical_width, self.screen_height)
-        return camera_world_rect.colliderect(rect)
\ No newline at end of file
+        return self.get_view_rect().colliderect(rect)
+
+    def room_at(self, x, y):
+        # Мир разбит на комнаты размером с логический экран
+        return (int(x // self.screen_width), int(y // self.screen_height))
+
+    def nearby_rooms(self, margin=1):
+        # Комнаты под кадром и под целью перехода плюс кольцо соседних.
+        # Цель выставляется в начале перехода, так что комната просыпается до того, как въедет в кадр.
+        rooms = set()
+        for x, y in ((self.current_x, self.current_y), (self.target_x, self.target_y)):
+            left, top = self.room_at(x - self.x_offset, y)
+            right, bottom = self.room_at(x - self.x_offset + self.physical_width - 1, y + self.screen_height - 1)
+            for room_x in range(left - margin, right + margin + 1):
+                for room_y in range(top - margin, bottom + margin + 1):
+                    rooms.add((room_x, room_y))
+        return rooms
\ No newline at end of file
@@ -2,30 +2,67 @@
 
 import pygame
 import math
+from utils import make_alpha_variant
+from assets import assets
 
 GRAVITY = 1800 
+# Затухание отброса задано на кадр при 60 FPS, в update пересчитывается через dt
+HURT_DAMPING = 0.95
+BLINK_ALPHA = 128
+
+class AnimationFrames:
+    # Кадры листа спрайтов, нарезанные один раз, вместе с отражёнными копиями
+    def __init__(self, frames):
+        self.frames = tuple(frames)
+        self.flipped = tuple(pygame.transform.flip(frame, True, False) for frame in self.frames)
+        # Полупрозрачные варианты для мигания: альфа запечена в пиксели, set_alpha на кадре не нужен
+        self.faded = {id(frame): make_alpha_variant(frame, BLINK_ALPHA) for frame in self.frames + self.flipped}
+
+    def __len__(self):
+        return len(self.frames)
+
+# Общий на весь процесс кэш: (путь, ширина кадра, высота кадра, макс. кадров) -> AnimationFrames
+_animation_cache = {}
+
+def load_animation_frames(image_path, sprite_width, sprite_height, max_frames=None, placeholder_color=(255, 0, 255)):
+    key = (image_path, sprite_width, sprite_height, max_frames)
+    frames = _animation_cache.get(key)
+    if frames is not None: return frames
+
+    try:
+        # Блинк строится через альфу в пикселях, поэтому листы всегда с альфа-каналом
+        sheet = assets.load(image_path, alpha=True)
+    except (pygame.error, FileNotFoundError):
+        print(f"Warning: Could not load image {image_path}. Using placeholder.")
+        sheet = pygame.Surface((sprite_width * 4, sprite_height), pygame.SRCALPHA)
+        sheet.fill(placeholder_color)
+        pygame.draw.rect(sheet, (0, 0, 0), (0, 0, sprite_width, sprite_height), 1)
+
+    frame_count = sheet.get_width() // sprite_width
+    if max_frames is not None: frame_count = min(frame_count, max_frames)
+    frames = AnimationFrames(sheet.subsurface((i * sprite_width, 0, sprite_width, sprite_height)) for i in range(frame_count))
+    _animation_cache[key] = frames
+    return frames
 
 class Enemy(pygame.sprite.Sprite):
+    # Направление, в которое смотрит исходный лист спрайтов
+    sprite_faces_right = True
+    max_sheet_frames = None
+
     def __init__(self, x, y, image_path, sprite_width, sprite_height, properties=None):
         super().__init__()
         self.properties = properties or {}
-        try:
-            self.original_image_sheet = pygame.image.load(image_path).convert_alpha()
-        except pygame.error:
-            print(f"Warning: Could not load image {image_path}. Using placeholder.")
-            self.original_image_sheet = pygame.Surface((sprite_width * 4, sprite_height), pygame.SRCALPHA)
-            self.original_image_sheet.fill((255, 0, 255))
-            pygame.draw.rect(self.original_image_sheet, (0, 0, 0), (0, 0, sprite_width, sprite_height), 1)
-
         self.sprite_width = sprite_width
         self.sprite_height = sprite_height
-        self.animation_frames = []
+        self.frame_set = load_animation_frames(image_path, sprite_width, sprite_height, self.max_sheet_frames)
+        self.animation_frames = self.frame_set.frames
         self.current_frame = 0
         self.animation_speed = 0.15
-        self.last_update = pygame.time.get_ticks()
+        self.animation_timer = 0.0
 
-        self._load_animation_frames()
-        self.image = self.animation_frames[self.current_frame]
+        self.base_frames = self.frame_set
+        self.base_image = self.animation_frames[self.current_frame]
+        self.image = self.base_image
         self.rect = self.image.get_rect(topleft=(x, y))
 
         self.x = float(self.rect.x)
@@ -57,40 +94,33 @@ class Enemy(pygame.sprite.Sprite):
         self.death_duration = 0.5
         self.initial_alpha = 255
         self.death_scale = 1.0
+        # EventBus игры; враг сам сообщает о своей смерти
+        self.events = None
+
+    def _set_frame(self, frame_set, index):
+        # Кадры общие для всех экземпляров, поэтому их нельзя менять на месте
+        self.base_frames = frame_set
+        if self.facing_right == self.sprite_faces_right: self.base_image = frame_set.frames[index]
+        else: self.base_image = frame_set.flipped[index]
+
+    def _apply_blink(self):
+        if self.invincible and math.sin(self.invincible_timer * 40) > 0:
+            self.image = self.base_frames.faded[id(self.base_image)]
+        else:
+            self.image = self.base_image
 
-    def _load_animation_frames(self):
-        frame_count = self.original_image_sheet.get_width() // self.sprite_width
-        for i in range(frame_count):
-            if i * self.sprite_width + self.sprite_width <= self.original_image_sheet.get_width():
-                frame = self.original_image_sheet.subsurface(
-                    (i * self.sprite_width, 0, self.sprite_width, self.sprite_height)
-                )
-                self.animation_frames.append(frame)
-            else:
-                print(f"Warning: Frame index {i} out of bounds for image sheet of width {self.original_image_sheet.get_width()} and sprite width {self.sprite_width}.")
-
-    def update_animation(self):
+    def update_animation(self, dt):
         if self.dying:
             return
 
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.animation_speed * 1000:
-            self.last_update = now
-            self.current_frame = (self.current_frame + 1) % len(self.animation_frames)
-            
-            base_frame = self.animation_frames[self.current_frame]
-            if not self.facing_right:
-                self.image = pygame.transform.flip(base_frame, True, False)
-            else:
-                self.image = base_frame.copy()
+        # Время анимации копится из dt симуляции, а не из часов: запись ввода воспроизводится точно
+        self.animation_timer += dt
+        if self.animation_timer > self.animation_speed:
+            self.animation_timer = 0.0
+            self.current_frame = (self.current_frame + 1) % len(self.frame_set)
+            self._set_frame(self.frame_set, self.current_frame)
 
-        if self.invincible:
-            if math.sin(self.invincible_timer * 40) > 0:
-                self.image.set_alpha(128)
-            else:
-                self.image.set_alpha(255)
-        else:
-            self.image.set_alpha(255)
+        self._apply_blink()
 
     def take_damage(self, damage, knockback_direction):
         if not self.invincible and not self.dying:
@@ -111,9 +141,14 @@ class Enemy(pygame.sprite.Sprite):
         self.death_timer = 0.0
         self.velocity_x = 0
         self.velocity_y = 0
-        self.image.set_alpha(self.initial_alpha)
+        self.image = self.base_image
         self.death_scale = 1.0
 
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.events: self.events.publish("enemy_removed", self)
+
     def update(self, obstacles, platforms, player, world_width, world_height, dt):
         if dt > 0.1: dt = 0.1
 
@@ -173,10 +208,10 @@ class Enemy(pygame.sprite.Sprite):
         self._handle_world_bounds(world_width)
 
         self.ai_update(player, dt)
-        self.update_animation()
+        self.update_animation(dt)
 
     def _handle_horizontal_collisions(self, obstacles):
-        hit_list = pygame.sprite.spritecollide(self, obstacles, False)
+        hit_list = obstacles.query(self.rect)
         for obstacle in hit_list:
             if self.velocity_x > 0: self.rect.right = obstacle.rect.left
             elif self.velocity_x < 0: self.rect.left = obstacle.rect.right
@@ -185,7 +220,7 @@ class Enemy(pygame.sprite.Sprite):
 
     def _handle_vertical_collisions(self, obstacles, platforms):
         self.on_ground = False
-        hit_list = pygame.sprite.spritecollide(self, obstacles, False)
+        hit_list = obstacles.query(self.rect)
         for obstacle in hit_list:
             if self.velocity_y > 0:
                 self.rect.bottom = obstacle.rect.top
@@ -195,7 +230,7 @@ class Enemy(pygame.sprite.Sprite):
             self.y = float(self.rect.y)
             self.velocity_y = 0
 
-        platform_hits = pygame.sprite.spritecollide(self, platforms, False)
+        platform_hits = platforms.query(self.rect)
         for platform in platform_hits:
             if self.velocity_y > 0 and self.rect.bottom <= platform.rect.top + 5:
                 self.rect.bottom = platform.rect.top
@@ -216,9 +251,10 @@ class Enemy(pygame.sprite.Sprite):
     def ai_update(self, player, dt):
         pass
 
-    def draw_health_bar(self, surface, camera):
+    def draw_health_bar(self, surface, camera, draw_rect=None):
+        # draw_rect - экранный rect, где нарисован спрайт (с интерполяцией), чтобы полоска не отставала
         if self.current_health < self.max_health and not self.dying:
-            screen_pos = camera.apply(self.rect).topleft
+            screen_pos = (camera.apply(self.rect) if draw_rect is None else draw_rect).topleft
             bar_width = self.rect.width
             bar_height = 5
             health_ratio = self.current_health / self.max_health
@@ -229,6 +265,8 @@ class Enemy(pygame.sprite.Sprite):
             pygame.draw.rect(surface, (0, 0, 0), bg_rect, 1)
 
 class MeleeGhost(Enemy):
+    max_sheet_frames = 4
+
     def __init__(self, x, y, properties=None):
         super().__init__(x, y, "Sprites/closecombat_ghost.png", 64, 64, properties)
         self.speed = self.properties.get('speed', 120)
@@ -238,19 +276,13 @@ class MeleeGhost(Enemy):
         self.attack_cooldown_max = 1.5
         self.animation_speed = 0.1
 
-    def _load_animation_frames(self):
-        for i in range(4):
-            if i * self.sprite_width + self.sprite_width <= self.original_image_sheet.get_width():
-                frame = self.original_image_sheet.subsurface((i * self.sprite_width, 0, self.sprite_width, self.sprite_height))
-                self.animation_frames.append(frame)
-
     def ai_update(self, player, dt):
         if self.state == "hurt":
             if abs(self.velocity_x) < 1:
                 self.velocity_x = 0
                 self.state = "idle"
             else:
-                self.velocity_x *= 0.95
+                self.velocity_x *= HURT_DAMPING ** (dt * 60)
             return
 
         distance_to_player = math.hypot(self.rect.centerx - player.rect.centerx, self.rect.centery - player.rect.centery)
@@ -282,62 +314,40 @@ class MeleeGhost(Enemy):
             player.take_damage(self.damage, knockback_dir)
 
 class RangedGhost(Enemy):
-    def __init__(self, x, y, properties=None):
+    max_sheet_frames = 4
+
+    def __init__(self, x, y, properties=None, projectile_pool=None):
         super().__init__(x, y, "Sprites/longrangecombat_ghost_afk.png", 64, 64, properties)
         self.speed = self.properties.get('speed', 60)
         self.attack_range = 150
         self.damage = self.properties.get('damage', 1)
         self.knockback_power = self.properties.get('knockback', 300)
         self.attack_cooldown_max = 2.0
-        self.projectile_speed = 300
-        self.projectiles = pygame.sprite.Group()
+        self.projectile_speed = 600
+        self.projectile_pool = projectile_pool
         self.animation_speed = 0.15
         
-        try:
-            self.attack_animation_sheet = pygame.image.load("Sprites/longrangecombat_ghost_attack.png").convert_alpha()
-        except pygame.error:
-            self.attack_animation_sheet = pygame.Surface((self.sprite_width * 4, self.sprite_height), pygame.SRCALPHA)
-            self.attack_animation_sheet.fill((255, 100, 255))
-        
-        self.idle_animation_frames = self.animation_frames[:]
-        self.attack_animation_frames = []
-        self._load_attack_animation_frames()
+        self.idle_animation_frames = self.frame_set
+        self.attack_animation_frames = load_animation_frames("Sprites/longrangecombat_ghost_attack.png", self.sprite_width, self.sprite_height, 4, (255, 100, 255))
         self.attack_animation_duration = 0.6
         self.attack_animation_timer = 0.0
 
-    def _load_attack_animation_frames(self):
-        for i in range(4):
-            if i * self.sprite_width + self.sprite_width <= self.attack_animation_sheet.get_width():
-                frame = self.attack_animation_sheet.subsurface((i * self.sprite_width, 0, self.sprite_width, self.sprite_height))
-                self.attack_animation_frames.append(frame)
-
-    def update_animation(self):
+    def update_animation(self, dt):
         if self.dying: return
 
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.animation_speed * 1000:
-            self.last_update = now
+        self.animation_timer += dt
+        if self.animation_timer > self.animation_speed:
+            self.animation_timer = 0.0
             
             if self.state == "attacking":
                 if self.current_frame < len(self.attack_animation_frames) - 1:
                     self.current_frame += 1
-                base_frame = self.attack_animation_frames[self.current_frame]
+                self._set_frame(self.attack_animation_frames, self.current_frame)
             else:
                 self.current_frame = (self.current_frame + 1) % len(self.idle_animation_frames)
-                base_frame = self.idle_animation_frames[self.current_frame]
-            
-            if not self.facing_right:
-                self.image = pygame.transform.flip(base_frame, True, False)
-            else:
-                self.image = base_frame.copy()
+                self._set_frame(self.idle_animation_frames, self.current_frame)
 
-        if self.invincible:
-            if math.sin(self.invincible_timer * 40) > 0:
-                self.image.set_alpha(128)
-            else:
-                self.image.set_alpha(255)
-        else:
-            self.image.set_alpha(255)
+        self._apply_blink()
 
     def ai_update(self, player, dt):
         if self.state == "hurt":
@@ -345,7 +355,7 @@ class RangedGhost(Enemy):
                 self.velocity_x = 0
                 self.state = "idle"
             else:
-                self.velocity_x *= 0.95
+                self.velocity_x *= HURT_DAMPING ** (dt * 60)
             return
 
         distance_to_player = math.hypot(self.rect.centerx - player.rect.centerx, self.rect.centery - player.rect.centery)
@@ -385,51 +395,13 @@ class RangedGhost(Enemy):
         projectile_velocity_x = self.projectile_speed * math.cos(angle)
         projectile_velocity_y = self.projectile_speed * math.sin(angle)
         
-        projectile = EnemyProjectile(self.rect.centerx, self.rect.centery, projectile_velocity_x, projectile_velocity_y, self.damage)
-        self.projectiles.add(projectile)
-
-    def update(self, obstacles, platforms, player, world_width, world_height, dt):
-        super().update(obstacles, platforms, player, world_width, world_height, dt)
-        self.projectiles.update(obstacles, player, dt)
-
-class EnemyProjectile(pygame.sprite.Sprite):
-    def __init__(self, x, y, velocity_x, velocity_y, damage):
-        super().__init__()
-        self.image = pygame.Surface((10, 10), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, (255, 0, 255), (5, 5), 5)
-        self.rect = self.image.get_rect(center=(x, y))
-        self.x = x
-        self.y = y
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.damage = damage
-        self.lifetime = 3.0
-        self.timer = 0.0
-
-    def update(self, obstacles, player, dt):
-        if dt > 0.1: dt = 0.1
-
-        self.timer += dt
-        if self.timer >= self.lifetime:
-            self.kill()
-            return
-
-        self.x += self.velocity_x * dt
-        self.y += self.velocity_y * dt
-        # *** ИСПРАВЛЕНИЕ: Используем round() вместо int() для корректного округления ***
-        self.rect.x = round(self.x)
-        self.rect.y = round(self.y)
-
-        if pygame.sprite.spritecollideany(self, obstacles):
-            self.kill()
-            return
-
-        if self.rect.colliderect(player.rect):
-            knockback_dir = 1 if player.rect.centerx > self.rect.centerx else -1
-            player.take_damage(self.damage, knockback_dir)
-            self.kill()
+        if self.projectile_pool is not None:
+            self.projectile_pool.spawn(self.rect.centerx, self.rect.centery, projectile_velocity_x, projectile_velocity_y, self.damage)
 
 class EtherJumperBoss(Enemy):
+    # Исходный спрайт босса смотрит влево
+    sprite_faces_right = False
+
     def __init__(self, x, y, properties=None):
         super().__init__(x, y, "Sprites/boss_idle.png", 140, 120, properties)
         self.max_health = self.properties.get('health', 25)
@@ -450,69 +422,30 @@ class EtherJumperBoss(Enemy):
         self.active = False
         self.attack_cooldown = 0.0
 
-        self.idle_animation_frames = []
-        self.jump_animation_frames = []
-        self._load_animations()
-        self.animation_frames = self.idle_animation_frames
+        self.idle_animation_frames = self.frame_set
+        self.jump_animation_frames = load_animation_frames("Sprites/boss_jump.png", self.sprite_width, self.sprite_height, placeholder_color=(0, 0, 255))
         self.current_frame = 0
         self.animation_speed = 0.1
 
-    def _load_animations(self):
-        try:
-            idle_sheet = pygame.image.load("Sprites/boss_idle.png").convert_alpha()
-            frame_count = idle_sheet.get_width() // self.sprite_width
-            for i in range(frame_count):
-                if i * self.sprite_width + self.sprite_width <= idle_sheet.get_width():
-                    frame = idle_sheet.subsurface((i * self.sprite_width, 0, self.sprite_width, self.sprite_height))
-                    self.idle_animation_frames.append(frame)
-        except:
-            print("Failed to load boss idle animation")
-            self.idle_animation_frames = [pygame.Surface((self.sprite_width, self.sprite_height), pygame.SRCALPHA)]
-            self.idle_animation_frames[0].fill((255, 0, 0))
-
-        try:
-            jump_sheet = pygame.image.load("Sprites/boss_jump.png").convert_alpha()
-            frame_count = jump_sheet.get_width() // self.sprite_width
-            for i in range(frame_count):
-                if i * self.sprite_width + self.sprite_width <= jump_sheet.get_width():
-                    frame = jump_sheet.subsurface((i * self.sprite_width, 0, self.sprite_width, self.sprite_height))
-                    self.jump_animation_frames.append(frame)
-        except:
-            print("Failed to load boss jump animation")
-            self.jump_animation_frames = [pygame.Surface((self.sprite_width, self.sprite_height), pygame.SRCALPHA)]
-            self.jump_animation_frames[0].fill((0, 0, 255))
-
-    def update_animation(self):
+    def update_animation(self, dt):
         if self.dying:
             return
 
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.animation_speed * 1000:
-            self.last_update = now
+        self.animation_timer += dt
+        if self.animation_timer > self.animation_speed:
+            self.animation_timer = 0.0
             
             if self.state in ["jumping", "falling"]:
-                self.animation_frames = self.jump_animation_frames
+                self.frame_set = self.jump_animation_frames
             else:
-                self.animation_frames = self.idle_animation_frames
+                self.frame_set = self.idle_animation_frames
+            self.animation_frames = self.frame_set.frames
             
-            self.current_frame = (self.current_frame + 1) % len(self.animation_frames)
-            base_frame = self.animation_frames[self.current_frame]
-
-            # *** ИСПРАВЛЕНИЕ: Инвертированная логика отражения, так как исходный спрайт смотрит влево ***
-            if self.facing_right:
-                # Если нужно смотреть вправо, а спрайт смотрит влево - отражаем
-                self.image = pygame.transform.flip(base_frame, True, False)
-            else:
-                # Если нужно смотреть влево, и спрайт уже смотрит влево - просто копируем
-                self.image = base_frame.copy()
+            self.current_frame = (self.current_frame + 1) % len(self.frame_set)
+            # Отражение учитывает sprite_faces_right: исходный спрайт смотрит влево
+            self._set_frame(self.frame_set, self.current_frame)
         
-        if self.invincible:
-            if math.sin(self.invincible_timer * 40) > 0:
-                self.image.set_alpha(128)
-            else:
-                self.image.set_alpha(255)
-        else:
-            self.image.set_alpha(255)
+        self._apply_blink()
 
     def update(self, obstacles, platforms, player, world_width, world_height, dt):
         if not self.active:
@@ -535,7 +468,7 @@ class EtherJumperBoss(Enemy):
                 self.velocity_x = 0
                 self.state = "idle"
             else:
-                self.velocity_x *= 0.95
+                self.velocity_x *= HURT_DAMPING ** (dt * 60)
             return
 
         self.jump_timer -= dt
@@ -0,0 +1,19 @@
+# events.py
+# События жизненного цикла врагов: вместо опроса каждый кадр подписчики узнают об изменениях сразу.
+#   enemy_spawned(enemy)  - враг появился в мире (загрузка и сброс игры)
+#   enemy_removed(enemy)  - враг погиб и убран из групп
+
+class EventBus:
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, name, handler):
+        self.handlers.setdefault(name, []).append(handler)
+
+    def unsubscribe(self, name, handler):
+        handlers = self.handlers.get(name)
+        if handlers and handler in handlers: handlers.remove(handler)
+
+    def publish(self, name, *args):
+        # Копия списка: обработчик может отписаться прямо во время рассылки
+        for handler in list(self.handlers.get(name, ())): handler(*args)
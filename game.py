@@ -1,20 +1,34 @@
 # game.py
 
 import pygame
+import random
 from camera import MegaManCamera
 from player import Player
-from tiles import MapLoader, BreakableTile
+from tiles import MapLoader, BreakableTile, SpatialHash
 from ui import UIManager
 from vine import Vine
 from enemies import MeleeGhost, RangedGhost, EtherJumperBoss
+from profiler import FrameProfiler
+from projectiles import ProjectilePool
+from snapshot import WorldSnapshot
+from events import EventBus
+from utils import draw_overlay
+from music import MusicPlayer
+
+# Симуляция идёт фиксированным шагом, отрисовка интерполирует между шагами
+SIMULATION_RATE = 120
+FIXED_DT = 1.0 / SIMULATION_RATE
 
 class Game:
-    def __init__(self, screen, particles_enabled=True):
+    def __init__(self, screen, particles_enabled=True, map_path="Rooms/map.tmx", seed=None, music_enabled=True):
         self.screen = screen
         self.particles_enabled = particles_enabled
+        self.map_path = map_path
+        # Свой генератор случайных чисел: с тем же зерном запись ввода воспроизводится один в один
+        self.seed = seed
+        self.rng = random.Random(seed)
         pygame.mixer.init()
         pygame.mixer.set_num_channels(8)
-        self.channel_bg_music = pygame.mixer.Channel(0)
         self.channel_player_charge = pygame.mixer.Channel(1)
         self.channel_player_actions = pygame.mixer.Channel(2)
         self.channel_collectables = pygame.mixer.Channel(3)
@@ -26,19 +40,37 @@ class Game:
         self.game_over = False
         self.vines = pygame.sprite.Group()
         self.enemies = pygame.sprite.Group()
-        self.enemy_projectiles = pygame.sprite.Group()
+        self.enemy_grid = SpatialHash(group=self.enemies)
+        self.projectiles = ProjectilePool()
         self.boss = None
+        self.initial_boss = None
+        self.world_snapshot = None
+        # Враги по комнатам камеры: обновляются только те, что рядом с кадром
+        self.enemy_rooms = {}
+        self.enemy_room_of = {}
+        self.awake_enemies = []
+        # Ворота boss_dependent закрыты, пока жив хоть один враг, кроме босса
+        self.gate_enemies = 0
+        self.events = EventBus()
+        self.events.subscribe("enemy_spawned", self._on_enemy_spawned)
+        self.events.subscribe("enemy_removed", self._on_enemy_removed)
         self.controls = {}
+        self.keys = None
+        self.previous_positions = {}
+        self.render_alpha = 1.0
+        self.profiler = FrameProfiler()
 
         self.music_volume = 0.5
         self.sfx_volume = 0.7
         
         self.load_sounds()
         
-        self.bg_music = pygame.mixer.Sound("Music/forest.mp3")
-        self.bg_music.set_volume(self.music_volume)
-        self.boss_music = pygame.mixer.Sound("Music/boss.mp3")
-        self.boss_music.set_volume(self.music_volume)
+        # Музыка играет потоково, треки заранее читаются в фоне
+        self.music = MusicPlayer(self.music_volume, enabled=music_enabled)
+        self.bg_music = "Music/forest.mp3"
+        self.boss_music = "Music/boss.mp3"
+        self.music.preload(self.bg_music)
+        self.music.preload(self.boss_music)
 
         self.boss_visible = False
         self.current_bg_music = self.bg_music
@@ -64,10 +96,7 @@ class Game:
 
     def set_music_volume(self, volume):
         self.music_volume = max(0.0, min(1.0, volume))
-        self.bg_music.set_volume(self.music_volume)
-        self.boss_music.set_volume(self.music_volume)
-        if self.channel_bg_music.get_sound():
-             self.channel_bg_music.set_volume(self.music_volume)
+        self.music.set_volume(self.music_volume)
 
     def set_sfx_volume(self, volume):
         self.sfx_volume = max(0.0, min(1.0, volume))
@@ -75,8 +104,37 @@ class Game:
             if sound: sound.set_volume(self.sfx_volume)
 
     def reset_game(self):
-        self.map_loader = MapLoader()
-        self.map_loader.load_map("Rooms/map.tmx")
+        # Мир строится с нуля только один раз, дальше сброс восстанавливает его из снимка
+        if self.world_snapshot is None: self._load_world()
+        else:
+            self.world_snapshot.restore()
+            self.ui.reset()
+        self.ui.start_intro()
+        self.game_over = False
+        self.vines.empty()
+        self.projectiles.clear()
+        self.map_loader.particles.clear()
+        self.boss = self.initial_boss
+        self.boss_visible = False
+        self.current_bg_music = self.bg_music
+        
+        self.music.stop()
+
+        self.enemy_rooms.clear()
+        self.enemy_room_of.clear()
+        self.gate_enemies = 0
+        for enemy in self.enemies: self.events.publish("enemy_spawned", enemy)
+        self.awake_enemies = self._nearby_enemies()
+
+        self.update_breakable_tiles_collidable_state()
+        self.boss_defeated = False
+        self.fading_to_black = False
+        self.fading_from_black = False
+        if self.world_snapshot is None: self.world_snapshot = self._capture_world()
+
+    def _load_world(self):
+        self.map_loader = MapLoader(self.rng)
+        self.map_loader.load_map(self.map_path)
         self.player = Player(*self.map_loader.player_spawn_pos,
                              snd_hurt=self.snd_hurt,
                              snd_vine=self.snd_vine,
@@ -89,50 +147,82 @@ class Game:
         
         self.ui = UIManager()
         self.ui.player = self.player
-        self.ui.start_intro()
-        self.game_over = False
-        self.vines.empty()
         self.enemies.empty()
-        self.enemy_projectiles.empty()
-        self.boss = None
-        self.boss_visible = False
-        self.current_bg_music = self.bg_music
-        
-        self.channel_bg_music.stop()
+        self.initial_boss = None
 
         for enemy_data in self.map_loader.enemies_data:
             enemy_type = enemy_data['type']
             x, y = enemy_data['pos']
             properties = enemy_data['properties']
             if enemy_type == "MeleeGhost": self.enemies.add(MeleeGhost(x, y, properties))
-            elif enemy_type == "RangedGhost": self.enemies.add(RangedGhost(x, y, properties))
+            elif enemy_type == "RangedGhost": self.enemies.add(RangedGhost(x, y, properties, self.projectiles))
             elif enemy_type == "EtherJumperBoss":
-                self.boss = EtherJumperBoss(x, y, properties)
-                self.enemies.add(self.boss)
-
-        self.update_breakable_tiles_collidable_state()
-        self.boss_defeated = False
-        self.fading_to_black = False
-        self.fading_from_black = False
+                self.initial_boss = EtherJumperBoss(x, y, properties)
+                self.enemies.add(self.initial_boss)
+        for enemy in self.enemies: enemy.events = self.events
+
+    def _capture_world(self):
+        loader = self.map_loader
+        entities = [self.player, self.camera] + self.enemies.sprites() + loader.falling_tiles.sprites() + loader.breakable_tiles.sprites() + loader.healing_tiles.sprites()
+        groups = [self.enemies, loader.collectables, loader.falling_tiles, loader.breakable_tiles, loader.healing_tiles]
+        grids = [loader.obstacle_grid, loader.collectable_grid, loader.falling_grid, loader.healing_grid, self.enemy_grid]
+        return WorldSnapshot(entities, groups, grids)
+
+    def _place_enemy(self, enemy):
+        self.enemy_grid.add(enemy)
+        room = self.camera.room_at(*enemy.rect.center)
+        previous = self.enemy_room_of.get(enemy)
+        if previous == room: return
+        if previous is not None: del self.enemy_rooms[previous][enemy]
+        # dict как упорядоченное множество: порядок обновления врагов стабилен между запусками
+        self.enemy_rooms.setdefault(room, {})[enemy] = None
+        self.enemy_room_of[enemy] = room
+
+    def _forget_enemy(self, enemy):
+        self.enemy_grid.remove(enemy)
+        room = self.enemy_room_of.pop(enemy, None)
+        if room is not None: del self.enemy_rooms[room][enemy]
+
+    def _on_enemy_spawned(self, enemy):
+        self._place_enemy(enemy)
+        if not isinstance(enemy, EtherJumperBoss): self.gate_enemies += 1
+
+    def _on_enemy_removed(self, enemy):
+        self._forget_enemy(enemy)
+        if not isinstance(enemy, EtherJumperBoss):
+            self.gate_enemies -= 1
+            if not self.gate_enemies: self.update_breakable_tiles_collidable_state()
+        if enemy is self.boss:
+            self.boss = None
+            self.boss_defeated = True
+            self.start_fade(True, self.show_demo_end_message)
+
+    def _nearby_enemies(self):
+        enemies = []
+        for room in sorted(self.camera.nearby_rooms()):
+            bucket = self.enemy_rooms.get(room)
+            if bucket: enemies.extend(bucket)
+        return enemies
 
     def update_breakable_tiles_collidable_state(self):
-        non_boss_enemies_exist = any(not isinstance(enemy, EtherJumperBoss) for enemy in self.enemies)
+        # Вызывается при сбросе и по событию, когда гибнет последний враг, кроме босса
+        non_boss_enemies_exist = self.gate_enemies > 0
         for tile in self.map_loader.breakable_tiles:
-            if tile.properties.get('boss_dependent', False):
+            if tile.properties.get('boss_dependent', False) and not tile.broken:
                 is_collidable = non_boss_enemies_exist
                 if tile.collidable != is_collidable:
                     tile.collidable = is_collidable
                     if is_collidable:
-                        if tile not in self.map_loader.obstacles: self.map_loader.obstacles.add(tile)
+                        self.map_loader.obstacle_grid.add(tile)
                     else:
-                        tile.remove(self.map_loader.obstacles)
+                        self.map_loader.obstacle_grid.remove(tile)
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             if self.ui.showing_intro:
                 if event.key == pygame.K_RETURN and self.ui.show_prompt:
                     self.ui.skip_intro()
-                    self.channel_bg_music.play(self.bg_music, -1)
+                    self.music.play(self.bg_music)
                 return
             if self.paused or self.fading_to_black or self.fading_from_black: return
 
@@ -142,11 +232,13 @@ class Game:
             if event.key == self.controls.get('attack') and not self.player.is_charging:
                 if self.player.attack(self.vines): self.channel_player_actions.play(self.snd_vine)
 
-    def handle_input(self, controls):
+    def handle_input(self, controls, keys=None):
         self.controls = controls
+        # Зажатые клавиши запоминаются для update: ENTER после проигрыша читается отсюда, а не с клавиатуры
+        if keys is None: keys = pygame.key.get_pressed()
+        self.keys = keys
         if self.paused or self.game_over or self.ui.showing_intro or self.fading_to_black or self.fading_from_black: return
 
-        keys = pygame.key.get_pressed()
         MOVE_SPEED = 250 
 
         if not self.player.dashing and not self.player.is_knockback:
@@ -180,17 +272,35 @@ class Game:
         self.fading_from_black = not to_black
         self.fade_alpha = 0 if to_black else 255
         self.fade_callback = callback
-        if to_black: self.channel_bg_music.fadeout(500)
+        if to_black: self.music.stop(0.5)
 
     def show_demo_end_message(self):
         self.ui.show_demo_end_screen()
 
+    def _store_previous_positions(self):
+        self.previous_positions = {self.player: self.player.rect.topleft}
+        for group in [self.vines, self.awake_enemies]:
+            for sprite in group:
+                self.previous_positions[sprite] = sprite.rect.topleft
+        self.projectiles.store_previous()
+        self.camera.store_previous()
+
+    def _interpolated_rect(self, sprite):
+        previous = self.previous_positions.get(sprite)
+        if previous is None or self.render_alpha >= 1.0:
+            return self.camera.apply(sprite.rect)
+        x = previous[0] + (sprite.rect.x - previous[0]) * self.render_alpha
+        y = previous[1] + (sprite.rect.y - previous[1]) * self.render_alpha
+        return self.camera.apply(pygame.Rect(round(x), round(y), sprite.rect.width, sprite.rect.height))
+
     def update(self, dt):
+        self._store_previous_positions()
+        self.music.update(dt)
         if self.ui.showing_intro:
             self.ui.update_intro(dt)
             return
         if self.game_over:
-             if pygame.key.get_pressed()[pygame.K_RETURN]: self.reset_game()
+             if self.keys is not None and self.keys[pygame.K_RETURN]: self.reset_game()
              return
 
         if self.fading_to_black or self.fading_from_black:
@@ -212,57 +322,59 @@ class Game:
                 new_boss_visible = self.boss and self.boss.alive() and self.camera.is_in_camera_view(self.boss.rect)
                 if new_boss_visible != self.boss_visible:
                     self.boss_visible = new_boss_visible
-                    self.channel_bg_music.fadeout(500)
-                    next_music = self.boss_music if new_boss_visible else self.bg_music
-                    self.channel_bg_music.play(next_music, -1)
-                elif not self.channel_bg_music.get_busy():
-                    self.channel_bg_music.play(self.bg_music, -1)
-            
-            self.player.update(self.map_loader.obstacles, self.map_loader.platforms, self.map_loader.falling_tiles, self.map_loader.map_width, self.map_loader.map_height, dt)
-            self.update_breakable_tiles_collidable_state()
-            self.enemies.update(self.map_loader.obstacles, self.map_loader.platforms, self.player, self.map_loader.map_width, self.map_loader.map_height, dt)
-            for enemy in self.enemies:
-                if hasattr(enemy, 'projectiles'): self.enemy_projectiles.add(enemy.projectiles.sprites())
+                    # Смена трека: старый затухает, новый нарастает
+                    self.music.play(self.boss_music if new_boss_visible else self.bg_music)
+                elif not self.music.is_busy():
+                    self.music.play(self.bg_music)
             
-            for enemy in self.enemies.copy():
-                if not enemy.alive():
-                    self.enemies.remove(enemy)
-                    if enemy is self.boss:
-                        self.boss = None
-                        self.boss_defeated = True
-                        self.start_fade(True, self.show_demo_end_message)
-
-            self.enemy_projectiles.update(self.map_loader.obstacles, self.player, dt)
+            with self.profiler.section("player"):
+                self.player.update(self.map_loader.obstacle_grid, self.map_loader.platform_grid, self.map_loader.falling_grid, self.map_loader.map_width, self.map_loader.map_height, dt)
+            with self.profiler.section("enemies"):
+                # Враги в дальних комнатах спят; проснутся, когда камера двинется к их комнате
+                awake_enemies = self._nearby_enemies()
+                for enemy in awake_enemies:
+                    enemy.update(self.map_loader.obstacle_grid, self.map_loader.platform_grid, self.player, self.map_loader.map_width, self.map_loader.map_height, dt)
+                
+                # Убитые уже убраны из комнат обработчиком enemy_removed
+                for enemy in awake_enemies:
+                    if enemy.alive(): self._place_enemy(enemy)
+                self.awake_enemies = [enemy for enemy in awake_enemies if enemy.alive()]
+
+            with self.profiler.section("projectiles"):
+                self.projectiles.update(self.map_loader.obstacle_grid, self.player, dt)
             
-            self.map_loader.falling_tiles.update(dt)
-            self.map_loader.breakable_tiles.update(dt)
-
-            enemy_hits = pygame.sprite.spritecollide(self.player, self.enemies, False)
-            for enemy in enemy_hits:
-                if self.player.dashing:
-                    enemy.take_damage(self.player.dash_damage, 1 if enemy.rect.centerx > self.player.rect.centerx else -1)
-                elif hasattr(enemy, 'health') and enemy.health > 0:
-                    self.player.take_damage(enemy.damage, 1 if self.player.rect.centerx > enemy.rect.centerx else -1)
-
-            vine_hits = pygame.sprite.groupcollide(self.vines, self.enemies, False, False)
-            for vine, enemies_hit in vine_hits.items():
-                for enemy in enemies_hit:
+            with self.profiler.section("tiles"):
+                self.map_loader.falling_tiles.update(dt)
+                self.map_loader.breakable_tiles.update(dt)
+                self.map_loader.particles.update(dt)
+
+            with self.profiler.section("collision"):
+                for enemy in self.enemy_grid.query_rect(self.player.rect):
+                    if self.player.dashing:
+                        enemy.take_damage(self.player.dash_damage, 1 if enemy.rect.centerx > self.player.rect.centerx else -1)
+                    elif hasattr(enemy, 'health') and enemy.health > 0:
+                        self.player.take_damage(enemy.damage, 1 if self.player.rect.centerx > enemy.rect.centerx else -1)
+
+                for vine, enemy in self.enemy_grid.query_pairs(self.vines):
                     enemy.take_damage(1, 1 if enemy.rect.centerx > vine.rect.centerx else -1)
 
-            healing_hits = pygame.sprite.spritecollide(self.player, self.map_loader.healing_tiles, True)
-            for tile in healing_hits:
-                self.player.heal(self.player.max_health)
-                self.channel_healing.play(self.snd_heal)
-                self.ui.create_floating_text("HP FULL!", self.camera.apply(self.player.rect).midtop, (0, 255, 0))
+                healing_hits = self.map_loader.healing_grid.query_rect(self.player.rect)
+                for tile in healing_hits:
+                    self.map_loader.healing_grid.remove(tile)
+                    self.player.heal(self.player.max_health)
+                    self.channel_healing.play(self.snd_heal)
+                    self.ui.create_floating_text("HP FULL!", self.camera.apply(self.player.rect).midtop, (0, 255, 0))
 
             self.vines.update(dt)
             
             if self.player.current_health <= 0 and not self.game_over:
                 self.game_over = True
                 self.ui.game_over = True
-                self.channel_bg_music.stop()
+                self.music.stop()
 
-            coins_hit = pygame.sprite.spritecollide(self.player, self.map_loader.collectables, True)
+            with self.profiler.section("collision"):
+                coins_hit = self.map_loader.collectable_grid.query_rect(self.player.rect)
+                for coin in coins_hit: self.map_loader.collectable_grid.remove(coin)
             if coins_hit:
                 self.ui.coins_collected += len(coins_hit)
                 self.player.dash_damage += len(coins_hit)
@@ -273,37 +385,45 @@ class Game:
                     self.ui.create_floating_text("DMG UP!", self.camera.apply(self.player.rect).midtop, (255, 215, 0))
 
             self.camera.update(self.player, dt)
-            self.ui.update(dt, self.paused)
+            with self.profiler.section("ui"):
+                self.ui.update(dt, self.paused)
 
-    def render(self):
+    def render(self, alpha=1.0):
+        self.render_alpha = alpha
+        self.camera.interpolate(alpha)
         self.screen.fill((77, 9, 179))
         
         if not self.ui.showing_intro and not self.ui.showing_demo_end:
-            self.map_loader.draw_parallax_background(self.screen, self.camera.current_x, self.camera.current_y)
+            with self.profiler.section("render_background"):
+                self.map_loader.draw_parallax_background(self.screen, self.camera.view_x, self.camera.view_y)
             
-            self.map_loader.draw_static_tiles(self.screen, self.camera)
-            self.map_loader.draw_dynamic_tiles(self.screen, self.camera)
+            with self.profiler.section("render_tiles"):
+                self.map_loader.draw_static_tiles(self.screen, self.camera)
+                self.map_loader.draw_dynamic_tiles(self.screen, self.camera)
             
-            for group in [self.vines, self.enemy_projectiles, self.enemies]:
-                for sprite in group:
-                    self.screen.blit(sprite.image, self.camera.apply(sprite.rect))
-
-            for enemy in self.enemies:
-                if not isinstance(enemy, EtherJumperBoss): enemy.draw_health_bar(self.screen, self.camera)
-            
-            if not self.game_over:
-                self.screen.blit(self.player.image, self.camera.apply(self.player.rect))
-                self.player.draw_charge_bar(self.screen, self.camera)
+            with self.profiler.section("render_sprites"):
+                for vine in self.vines:
+                    self.screen.blit(vine.image, self._interpolated_rect(vine))
+                self.projectiles.draw(self.screen, self.camera, self.render_alpha)
+                for enemy in self.awake_enemies:
+                    self.screen.blit(enemy.image, self._interpolated_rect(enemy))
+
+                for enemy in self.awake_enemies:
+                    if not isinstance(enemy, EtherJumperBoss): enemy.draw_health_bar(self.screen, self.camera, self._interpolated_rect(enemy))
+                
+                if not self.game_over:
+                    player_rect = self._interpolated_rect(self.player)
+                    self.screen.blit(self.player.image, player_rect)
+                    self.player.draw_charge_bar(self.screen, self.camera, player_rect)
 
-        self.ui.draw(self.screen)
+        with self.profiler.section("render_ui"):
+            self.ui.draw(self.screen)
 
-        if not self.game_over and self.boss and self.boss.alive():
-            self.boss.draw_health_bar(self.screen, self.camera)
+            if not self.game_over and self.boss and self.boss.alive():
+                self.boss.draw_health_bar(self.screen, self.camera)
 
-        if self.ui.showing_intro: self.ui.draw_intro(self.screen)
-        if self.ui.showing_demo_end: self.ui.draw_demo_end_screen(self.screen)
+            if self.ui.showing_intro: self.ui.draw_intro(self.screen)
+            if self.ui.showing_demo_end: self.ui.draw_demo_end_screen(self.screen)
 
-        if self.fading_to_black or self.fading_from_black:
-            fade_surf = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-            fade_surf.fill((0, 0, 0, int(self.fade_alpha)))
-            self.screen.blit(fade_surf, (0,0))
\ No newline at end of file
+            if self.fading_to_black or self.fading_from_black:
+                draw_overlay(self.screen, (0, 0, 0), self.fade_alpha)
\ No newline at end of file
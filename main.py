@@ -1,12 +1,21 @@
 import pygame
 import sys
 import random
+import argparse
 from menu_screens import MainMenuScreen, OptionsScreen, AuthorsScreen, PauseMenu
 from settings_manager import SettingsManager
-from utils import load_image, get_resource_path
-from game import Game
+from utils import load_image, get_resource_path, draw_overlay
+from game import Game, FIXED_DT
+from presentation import Presenter
+from profiler import FrameProfiler
+from replay import InputRecorder, InputReplay
+from statehash import StateHashWriter
 
 # Константы
+# F3 в игре включает профайлер; трасса пишется при выходе из игры
+PROFILER_KEY = pygame.K_F3
+PROFILER_TRACE_PATH = "profile_trace.json"
+
 RESOLUTIONS = {
     "4:3": (640, 480),
     "16:9": (854, 480),
@@ -64,12 +73,15 @@ class RainEffect:
             pygame.draw.line(surface, (130, 150, 180), start_pos, end_pos, 2)
             
         if self.flash_alpha > 0:
-            flash_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            flash_surface.fill((255, 255, 255, self.flash_alpha))
-            surface.blit(flash_surface, (0, 0))
+            draw_overlay(surface, (255, 255, 255), self.flash_alpha)
 
 class App:
-    def __init__(self):
+    def __init__(self, record_path=None, replay_path=None, state_hash_path=None):
+        # Запись ввода в файл или воспроизведение записанного вместо клавиатуры
+        self.record_path = record_path
+        self.replay_path = replay_path
+        # Отладка: хэш состояния симуляции на каждом тике (statehash.py)
+        self.state_hash_path = state_hash_path
         pygame.init()
         pygame.mixer.init()
         pygame.font.init()
@@ -94,6 +106,7 @@ class App:
 
         self.screen = pygame.display.set_mode(self.display_size, display_flags)
         self.game_surface = pygame.Surface(self.logical_size)
+        self.presenter = Presenter(self.screen, self.logical_size, self.settings_manager.get_integer_scale())
         
         # ИЗМЕНЕНИЕ: Добавлены переменные для преобразования координат мыши
         self.render_scale = 1.0
@@ -106,12 +119,7 @@ class App:
         self.logo_image = load_image("logo.png") 
         self.background_effect = RainEffect(self.game_surface)
 
-        try:
-            pygame.mixer.music.load(get_resource_path("Music", "menu.mp3"))
-            pygame.mixer.music.set_volume(self.settings_manager.get_music_volume())
-            pygame.mixer.music.play(-1) 
-        except Exception as e:
-            print(f"Не удалось загрузить музыку меню: {e}")
+        self.play_menu_music()
 
         self.screens = {
             "main_menu": MainMenuScreen(self.game_surface, self.settings_manager, self.background_effect, self.logo_image),
@@ -121,22 +129,19 @@ class App:
         self.current_screen_name = "main_menu"
         self.current_screen = self.screens[self.current_screen_name]
 
+    def play_menu_music(self):
+        try:
+            pygame.mixer.music.load(get_resource_path("Music", "menu.mp3"))
+            pygame.mixer.music.set_volume(self.settings_manager.get_music_volume())
+            pygame.mixer.music.play(-1) 
+        except Exception as e:
+            print(f"Не удалось загрузить музыку меню: {e}")
+
     def _render_surface(self):
-        self.screen.fill((0, 0, 0))
-        
+        self.presenter.present(self.game_surface)
         # ИЗМЕНЕНИЕ: Сохраняем масштаб и смещение для расчетов мыши
-        self.render_scale = min(self.display_size[0] / self.logical_size[0], self.display_size[1] / self.logical_size[1])
-        scaled_width = int(self.logical_size[0] * self.render_scale)
-        scaled_height = int(self.logical_size[1] * self.render_scale)
-        
-        scaled_surface = pygame.transform.scale(self.game_surface, (scaled_width, scaled_height))
-        
-        blit_x = (self.display_size[0] - scaled_width) // 2
-        blit_y = (self.display_size[1] - scaled_height) // 2
-        self.render_offset = (blit_x, blit_y)
-        
-        self.screen.blit(scaled_surface, self.render_offset)
-        pygame.display.flip()
+        self.render_scale = self.presenter.scale
+        self.render_offset = self.presenter.offset
 
     # ИЗМЕНЕНИЕ: Новая функция для получения логических координат мыши
     def get_logical_mouse_pos(self, physical_pos=None):
@@ -153,14 +158,40 @@ class App:
     def run_game(self):
         pygame.mixer.music.stop()
         
-        game_instance = Game(self.game_surface, self.settings_manager.get_particles_enabled())
+        recorder = replay = None
+        if self.replay_path:
+            replay = InputReplay.load(self.replay_path)
+            game_instance = Game(self.game_surface, replay.particles_enabled, replay.map_path, replay.seed)
+        else:
+            seed = random.randrange(2 ** 31)
+            game_instance = Game(self.game_surface, self.settings_manager.get_particles_enabled(), seed=seed)
+            if self.record_path:
+                recorder = InputRecorder(seed, self.settings_manager.get_controls(), game_instance.map_path, game_instance.particles_enabled)
         game_instance.set_music_volume(self.settings_manager.get_music_volume())
         game_instance.set_sfx_volume(self.settings_manager.get_sfx_volume())
         
         pause_menu = PauseMenu(self.game_surface, self.settings_manager, None)
+        profiler = FrameProfiler(history=240)
+        game_instance.profiler = profiler
         
+        state_hasher = StateHashWriter(self.state_hash_path) if self.state_hash_path else None
+        try:
+            self._game_loop(game_instance, pause_menu, profiler, recorder, replay, state_hasher)
+        finally:
+            if state_hasher:
+                state_hasher.close()
+                print(f"Хэши состояния записаны в {self.state_hash_path}: {state_hasher.ticks} тиков")
+            if recorder:
+                recorder.save(self.record_path)
+                print(f"Ввод записан в {self.record_path}: {recorder.ticks} тиков")
+            if profiler.trace_events:
+                profiler.write_trace(PROFILER_TRACE_PATH)
+                print(f"Трасса профайлера записана в {PROFILER_TRACE_PATH}")
+
+    def _game_loop(self, game_instance, pause_menu, profiler, recorder=None, replay=None, state_hasher=None):
         running = True
         last_time = pygame.time.get_ticks()
+        accumulator = 0.0
 
         while running:
             current_time = pygame.time.get_ticks()
@@ -172,7 +203,8 @@ class App:
             # ИЗМЕНЕНИЕ: Передаем исправленные координаты мыши в обработчики
             logical_mouse_pos_hover = self.get_logical_mouse_pos()
             
-            events = pygame.event.get()
+            with profiler.section("input"):
+                events = pygame.event.get()
             for event in events:
                 if event.type == pygame.QUIT:
                     self.quit()
@@ -180,30 +212,63 @@ class App:
                 logical_mouse_pos_click = self.get_logical_mouse_pos(event.pos) if hasattr(event, 'pos') else None
 
                 if event.type == pygame.KEYDOWN:
+                    if event.key == PROFILER_KEY:
+                        profiler.enabled = profiler.tracing = not profiler.enabled
+                        profiler.current = {}
                     if event.key == pygame.K_ESCAPE and not game_instance.game_over:
                         game_instance.paused = True
                         pause_menu.game_snapshot = self.game_surface.copy()
-                        game_instance.channel_bg_music.pause()
+                        game_instance.music.pause()
                         
                         action = self.run_pause_menu(pause_menu)
                         if action == "main_menu":
-                            game_instance.channel_bg_music.stop()
-                            pygame.mixer.music.play(-1)
+                            # Игра и меню делят один музыкальный поток, трек меню грузим заново
+                            game_instance.music.stop()
+                            self.play_menu_music()
                             running = False 
                         elif action == "continue":
                             game_instance.paused = False
-                            game_instance.channel_bg_music.unpause()
+                            game_instance.set_music_volume(self.settings_manager.get_music_volume())
+                            game_instance.music.unpause()
                 
-                if not game_instance.paused:
-                    game_instance.handle_event(event)
+                # При воспроизведении ввод берётся только из записи
+                if not game_instance.paused and not replay:
+                    if recorder: recorder.record_event(event)
+                    with profiler.section("input"):
+                        game_instance.handle_event(event)
 
+            # Фиксированный шаг: результат симуляции не зависит от max_fps
             if not game_instance.paused:
-                game_instance.handle_input(self.settings_manager.get_controls())
-                game_instance.update(dt)
+                accumulator += dt
+                controls = replay.controls if replay else self.settings_manager.get_controls()
+                while accumulator >= FIXED_DT:
+                    with profiler.section("input"):
+                        if replay:
+                            if replay.finished():
+                                print(f"Запись {self.replay_path} проиграна: {replay.tick} тиков")
+                                game_instance.music.stop()
+                                self.play_menu_music()
+                                running = False
+                                break
+                            events, keys = replay.next_tick()
+                            for event in events: game_instance.handle_event(event)
+                        else:
+                            keys = pygame.key.get_pressed()
+                            if recorder: recorder.record_tick(keys)
+                        game_instance.handle_input(controls, keys)
+                    with profiler.section("update"):
+                        game_instance.update(FIXED_DT)
+                    if state_hasher: state_hasher.record(game_instance)
+                    accumulator -= FIXED_DT
 
-            game_instance.render()
-            self._render_surface()
-            self.clock.tick(self.settings_manager.get_max_fps())
+            with profiler.section("render"):
+                game_instance.render(accumulator / FIXED_DT)
+            if profiler.enabled: profiler.draw(self.game_surface)
+            with profiler.section("present"):
+                self._render_surface()
+            with profiler.section("tick"):
+                self.clock.tick(self.settings_manager.get_max_fps())
+            profiler.end_frame()
 
     def run_pause_menu(self, pause_menu):
         pause_running = True
@@ -251,6 +316,8 @@ class App:
                     elif action == "exit":
                         self.quit()
                     elif action == "back":
+                        # Целый масштаб меняется сразу, без перезапуска
+                        self.presenter.set_integer_scale(self.settings_manager.get_integer_scale())
                         self.current_screen_name = "main_menu"
                         self.current_screen = self.screens[self.current_screen_name]
                     elif action in self.screens:
@@ -270,5 +337,14 @@ class App:
         sys.exit()
 
 if __name__ == "__main__":
-    app = App()
+    parser = argparse.ArgumentParser(description="Katharsis")
+    parser.add_argument("--record", help="записать ввод игры в файл")
+    parser.add_argument("--replay", help="проиграть записанный ввод")
+    parser.add_argument("--hash-state", help="писать хэш состояния симуляции на каждом тике")
+    args = parser.parse_args()
+
+    app = App(args.record, args.replay, args.hash_state)
+    if args.replay:
+        app.run_game()
+        app.replay_path = None
     app.run()
\ No newline at end of file
@@ -0,0 +1,230 @@
+# map_cache.py
+# Скомпилированные карты: TMX/TSX разбираются один раз, дальше карта читается
+# из сжатого бинарного файла рядом с TMX одним чтением, без XML.
+# Файл кэша: сигнатура, затем zlib: длина заголовка, заголовок JSON и сырые массивы слоёв и таблиц.
+# Только данные: испорченный или чужой файл просто пересобирается из TMX.
+
+import json
+import os
+import struct
+import zlib
+import xml.etree.ElementTree as ET
+from array import array
+
+CACHE_VERSION = 5
+CACHE_SUFFIX = ".cache"
+CACHE_MAGIC = b"KMAP"
+ARRAY_TYPECODES = ('I', 'd')
+
+# Булевы свойства тайлов -> биты в таблице флагов; горячий код проверяет биты, а не ключи словаря
+TILE_PLAYER_SPAWN = 1 << 0
+TILE_ENEMY = 1 << 1
+TILE_COLLECTABLE = 1 << 2
+TILE_FALL = 1 << 3
+TILE_BREAKABLE = 1 << 4
+TILE_HEALING = 1 << 5
+TILE_COLLIDABLE = 1 << 6
+TILE_PLATFORM = 1 << 7
+# damage > 0; сам урон лежит в отдельной таблице
+TILE_DAMAGE = 1 << 8
+FLAG_PROPERTIES = (('player_spawn', TILE_PLAYER_SPAWN), ('enemy', TILE_ENEMY), ('collectable', TILE_COLLECTABLE),
+                   ('fall', TILE_FALL), ('breakable', TILE_BREAKABLE), ('healing', TILE_HEALING),
+                   ('collidable', TILE_COLLIDABLE), ('platform', TILE_PLATFORM))
+# Тайлы, из которых MapLoader._process_tile делает объект со своим поведением, а не обычную стену
+TILE_SPECIAL = TILE_PLAYER_SPAWN | TILE_ENEMY | TILE_COLLECTABLE | TILE_FALL | TILE_BREAKABLE | TILE_HEALING
+
+# Уже прочитанные карты: повторная загрузка после смерти не трогает диск
+_compiled_maps = {}
+
+def parse_properties(node):
+    properties = {}
+    for prop in node.findall('properties/property'):
+        name, value, prop_type = prop.get('name'), prop.get('value'), prop.get('type')
+        if prop_type == 'bool': properties[name] = value == 'true'
+        elif prop_type == 'int': properties[name] = int(value)
+        elif prop_type == 'float': properties[name] = float(value)
+        else: properties[name] = value
+    return properties
+
+def _source_signature(paths):
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return signature
+
+def _parse_layer(layer, width, height):
+    gids = array('I', bytes(4 * width * height))
+    data_node = layer.find('data')
+    if data_node is None or data_node.get('encoding') != 'csv' or not data_node.text: return gids
+    for y, row in enumerate(data_node.text.strip().split('\n')):
+        stripped_row = row.strip()
+        if not stripped_row or y >= height: continue
+        for x, gid_str in enumerate(stripped_row.split(',')):
+            if gid_str and x < width: gids[y * width + x] = int(gid_str)
+    return gids
+
+def tile_flags(props):
+    flags = 0
+    for name, bit in FLAG_PROPERTIES:
+        if props.get(name): flags |= bit
+    if props.get('damage', 0) > 0: flags |= TILE_DAMAGE
+    return flags
+
+def compile_tile_table(tile_properties):
+    # -> (флаги, урон): массивы по gid, для gid без свойств - нули
+    size = max(tile_properties, default=0) + 1
+    flags, damage = array('I', bytes(4 * size)), array('d', bytes(8 * size))
+    for gid, props in tile_properties.items():
+        flags[gid] = tile_flags(props)
+        if flags[gid] & TILE_DAMAGE: damage[gid] = props['damage']
+    return flags, damage
+
+def is_mergeable(flags):
+    # Сплошная стена без урона: сливается с такими же соседями в один коллайдер
+    return flags & (TILE_COLLIDABLE | TILE_DAMAGE | TILE_SPECIAL) == TILE_COLLIDABLE
+
+def merge_colliders(layers, tile_properties, tile_flags_table):
+    # Жадное слияние: от верхней левой свободной клетки тянем прямоугольник вправо, потом вниз.
+    # Сливаются только клетки с одинаковыми свойствами. -> [(x, y, w, h, свойства, флаги)] в клетках
+    classes = {}
+    class_flags = {}
+    for layer_width, layer_height, gids in layers:
+        for index, gid in enumerate(gids):
+            if not gid or gid >= len(tile_flags_table) or not is_mergeable(tile_flags_table[gid]): continue
+            key = tuple(sorted(tile_properties[gid].items()))
+            classes.setdefault(key, set()).add((index % layer_width, index // layer_width))
+            class_flags[key] = tile_flags_table[gid]
+
+    colliders = []
+    for key, cells in classes.items():
+        props, flags = dict(key), class_flags[key]
+        for x, y in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+            if (x, y) not in cells: continue
+            w = 1
+            while (x + w, y) in cells: w += 1
+            h = 1
+            while all((i, y + h) in cells for i in range(x, x + w)): h += 1
+            for j in range(y, y + h):
+                for i in range(x, x + w): cells.discard((i, j))
+            colliders.append((x, y, w, h, props, flags))
+    return colliders
+
+def compile_map(map_path):
+    root = ET.parse(map_path).getroot()
+    map_dir = os.path.dirname(map_path)
+    sources = [map_path]
+    tilesets = []
+    tile_properties = {}
+
+    for ts in root.findall('tileset'):
+        firstgid = int(ts.get('firstgid'))
+        tileset_source = ts.get('source')
+        if tileset_source:
+            tileset_path = os.path.join(map_dir, tileset_source)
+            sources.append(tileset_path)
+            tileset_root = ET.parse(tileset_path).getroot()
+            image_path = os.path.join(os.path.dirname(tileset_path), tileset_root.find('image').get('source'))
+            for tile_node in tileset_root.findall('tile'):
+                tile_properties[firstgid + int(tile_node.get('id'))] = parse_properties(tile_node)
+        else:
+            image_path = os.path.join(map_dir, ts.find('image').get('source'))
+        tilesets.append((firstgid, image_path))
+
+    width, height = int(root.get('width')), int(root.get('height'))
+    flags, damage = compile_tile_table(tile_properties)
+    layers = []
+    for layer in root.findall('layer'):
+        layer_width = int(layer.get('width', width))
+        layer_height = int(layer.get('height', height))
+        layers.append((layer_width, layer_height, _parse_layer(layer, layer_width, layer_height)))
+
+    return {
+        'version': CACHE_VERSION,
+        'sources': _source_signature(sources),
+        'width': width,
+        'height': height,
+        'tilewidth': int(root.get('tilewidth')),
+        'tileheight': int(root.get('tileheight')),
+        'tilesets': tilesets,
+        'tile_properties': tile_properties,
+        'tile_flags': flags,
+        'tile_damage': damage,
+        'layers': layers,
+        'colliders': merge_colliders(layers, tile_properties, flags),
+    }
+
+def _is_fresh(data):
+    if data.get('version') != CACHE_VERSION: return False
+    try:
+        return _source_signature([path for path, _, _ in data['sources']]) == data['sources']
+    except OSError:
+        return False
+
+def encode_cache(data):
+    arrays = [gids for _, _, gids in data['layers']] + [data['tile_flags'], data['tile_damage']]
+    header = {key: data[key] for key in ('version', 'sources', 'width', 'height', 'tilewidth', 'tileheight', 'tilesets', 'colliders')}
+    header['tile_properties'] = list(data['tile_properties'].items())
+    header['layers'] = [(width, height) for width, height, _ in data['layers']]
+    header['arrays'] = [(values.typecode, len(values)) for values in arrays]
+    header_bytes = json.dumps(header).encode('utf-8')
+    body = struct.pack("<I", len(header_bytes)) + header_bytes + b"".join(values.tobytes() for values in arrays)
+    return CACHE_MAGIC + zlib.compress(body)
+
+def decode_cache(raw):
+    # ValueError/KeyError/TypeError на любом несоответствии формата
+    if raw[:4] != CACHE_MAGIC: raise ValueError("не кэш карты")
+    body = zlib.decompress(raw[4:])
+    header_length = struct.unpack_from("<I", body)[0]
+    header = json.loads(body[4:4 + header_length].decode('utf-8'))
+    if not isinstance(header, dict) or header.get('version') != CACHE_VERSION: raise ValueError("другая версия кэша")
+
+    arrays = []
+    pos = 4 + header_length
+    for typecode, length in header['arrays']:
+        if typecode not in ARRAY_TYPECODES: raise ValueError(f"тип массива {typecode!r}")
+        values = array(typecode)
+        size = values.itemsize * length
+        values.frombytes(body[pos:pos + size])
+        if len(values) != length: raise ValueError("кэш обрезан")
+        arrays.append(values)
+        pos += size
+    if len(arrays) != len(header['layers']) + 2: raise ValueError("число массивов")
+
+    # JSON не различает списки и кортежи, а ключи словарей у него строки
+    return {
+        'version': header['version'],
+        'sources': [tuple(source) for source in header['sources']],
+        'width': header['width'],
+        'height': header['height'],
+        'tilewidth': header['tilewidth'],
+        'tileheight': header['tileheight'],
+        'tilesets': [tuple(tileset) for tileset in header['tilesets']],
+        'tile_properties': {int(gid): props for gid, props in header['tile_properties']},
+        'tile_flags': arrays[-2],
+        'tile_damage': arrays[-1],
+        'layers': [(width, height, gids) for (width, height), gids in zip(header['layers'], arrays)],
+        'colliders': [tuple(collider) for collider in header['colliders']],
+    }
+
+def load_compiled_map(map_path):
+    data = _compiled_maps.get(map_path)
+    if data is not None and _is_fresh(data): return data
+
+    cache_path = map_path + CACHE_SUFFIX
+    data = None
+    try:
+        with open(cache_path, 'rb') as f: data = decode_cache(f.read())
+        if not _is_fresh(data): data = None
+    except (OSError, zlib.error, struct.error, ValueError, KeyError, TypeError, AttributeError):
+        data = None
+
+    if data is None:
+        data = compile_map(map_path)
+        try:
+            with open(cache_path, 'wb') as f: f.write(encode_cache(data))
+        except OSError as e:
+            print(f"Не удалось записать кэш карты {cache_path}: {e}")
+
+    _compiled_maps[map_path] = data
+    return data
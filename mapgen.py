@@ -0,0 +1,135 @@
+# mapgen.py
+# Генератор карт для нагрузочных тестов: пишет обычный TMX со стандартным тайлсетом 32-32.tsx.
+# python mapgen.py --width 560 --melee 40 --ranged 20 --output Rooms/stress.tmx
+
+import argparse
+import os
+import random
+import xml.etree.ElementTree as ET
+from map_cache import parse_properties
+
+DEFAULT_TSX = os.path.join("Rooms", "32-32.tsx")
+TILE_SIZE = 32
+# Rect игрока в точке появления по умолчанию (MapLoader ставит его в (100, 100), размер спрайта 56x95)
+SPAWN_RECT = (100, 100, 56, 95)
+
+# Параметры по умолчанию; бенчмарк перебирает любой из них через --sweep
+DEFAULTS = {
+    "width": 280,
+    "height": 40,
+    "density": 0.15,
+    "melee": 10,
+    "ranged": 5,
+    "boss": 0,
+    "coins": 20,
+    "falling": 10,
+    "breakable": 10,
+    "healing": 2,
+    "seed": 1,
+}
+
+def tileset_gids(tsx_path, firstgid=1):
+    # Подходящие gid по свойствам тайлов: категория -> список gid
+    root = ET.parse(tsx_path).getroot()
+    gids = {"ground": [], "platform": [], "fall": [], "breakable": [], "healing": [], "collectable": [],
+            "MeleeGhost": [], "RangedGhost": [], "EtherJumperBoss": []}
+    for tile_node in root.findall('tile'):
+        gid = firstgid + int(tile_node.get('id'))
+        props = parse_properties(tile_node)
+        if props.get('enemy'):
+            if props.get('type') in gids: gids[props['type']].append(gid)
+        elif props.get('damage'): continue
+        elif props.get('collectable'): gids["collectable"].append(gid)
+        elif props.get('healing'): gids["healing"].append(gid)
+        elif props.get('breakable'): gids["breakable"].append(gid)
+        elif props.get('fall'): gids["fall"].append(gid)
+        elif props.get('platform') and not props.get('collidable'): gids["platform"].append(gid)
+        elif props.get('collidable') and props.get('ground'): gids["ground"].append(gid)
+    return gids
+
+def generate_layers(gids, width, height, density, melee, ranged, boss, coins, falling, breakable, healing, seed):
+    rng = random.Random(seed)
+    terrain = [0] * (width * height)
+    objects = [0] * (width * height)
+    floor = height - 2
+
+    def cell(x, y): return y * width + x
+
+    spawn_x, spawn_y, spawn_w, spawn_h = SPAWN_RECT
+    spawn_cols = range(spawn_x // TILE_SIZE, (spawn_x + spawn_w - 1) // TILE_SIZE + 1)
+    spawn_rows = range(spawn_y // TILE_SIZE, (spawn_y + spawn_h - 1) // TILE_SIZE + 1)
+
+    # Пол во всю ширину
+    for y in range(floor, height):
+        for x in range(width): terrain[cell(x, y)] = rng.choice(gids["ground"])
+
+    # Полки через каждые 4 ряда; density - доля клеток полосы, занятых полками
+    for y in range(floor - 4, 3, -4):
+        x = 0
+        while x < width:
+            length = rng.randint(3, 8)
+            if rng.random() < density:
+                kind = "platform" if gids["platform"] and rng.random() < 0.3 else "ground"
+                for i in range(x, min(width, x + length)):
+                    # Полка не должна пересекать игрока в точке появления
+                    if i in spawn_cols and y in spawn_rows: continue
+                    terrain[cell(i, y)] = rng.choice(gids[kind])
+            x += length + rng.randint(1, 4)
+
+    # Объекты тоже не ставим рядом с точкой появления
+    free = [(x, y) for y in range(2, floor - 1) for x in range(8, width)
+            if not terrain[cell(x, y)] and not terrain[cell(x, y + 1)]]
+    rng.shuffle(free)
+
+    def place(category, count, cells):
+        for _ in range(count):
+            if not cells or not gids[category]: return
+            x, y = cells.pop()
+            objects[cell(x, y)] = rng.choice(gids[category])
+
+    place("collectable", coins, free)
+    place("fall", falling, free)
+    place("breakable", breakable, free)
+    place("healing", healing, free)
+
+    # Враги появляются над полом и падают на него сами
+    ground_cells = [(x, floor - 3) for x in range(8, width)]
+    rng.shuffle(ground_cells)
+    place("MeleeGhost", melee, ground_cells)
+    place("RangedGhost", ranged, ground_cells)
+    place("EtherJumperBoss", boss, ground_cells)
+    return terrain, objects
+
+def _layer_xml(layer_id, name, data, width, height):
+    rows = [",".join(str(gid) for gid in data[y * width:(y + 1) * width]) for y in range(height)]
+    csv = ",\n".join(rows)
+    return (f' <layer id="{layer_id}" name="{name}" width="{width}" height="{height}">\n'
+            f'  <data encoding="csv">\n{csv}\n</data>\n </layer>\n')
+
+def write_tmx(path, tsx_path=DEFAULT_TSX, **params):
+    params = dict(DEFAULTS, **params)
+    width, height = params["width"], params["height"]
+    terrain, objects = generate_layers(tileset_gids(tsx_path), **params)
+    tileset_source = os.path.relpath(tsx_path, os.path.dirname(os.path.abspath(path))).replace(os.sep, "/")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<map version="1.10" tiledversion="1.11.2" orientation="orthogonal" renderorder="right-down" '
+                f'width="{width}" height="{height}" tilewidth="32" tileheight="32" infinite="0" nextlayerid="3" nextobjectid="1">\n')
+        f.write(f' <tileset firstgid="1" source="{tileset_source}"/>\n')
+        f.write(_layer_xml(1, "terrain", terrain, width, height))
+        f.write(_layer_xml(2, "objects", objects, width, height))
+        f.write('</map>\n')
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор нагрузочных карт TMX")
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name}", type=type(default), default=default)
+    parser.add_argument("--tileset", default=DEFAULT_TSX, help="тайлсет .tsx")
+    parser.add_argument("--output", default=os.path.join("Rooms", "stress.tmx"))
+    args = parser.parse_args()
+    params = {name: getattr(args, name) for name in DEFAULTS}
+    print(write_tmx(args.output, args.tileset, **params))
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import pygame
 import math
 from pygame.locals import *
 from utils import load_font
+from text_cache import render_text
 
 # Цвета
 WHITE = (255, 255, 255)
@@ -42,7 +43,7 @@ class PixelButton:
         border_color = WHITE if (self.is_hovered or self.is_selected) else DARK_GREY
         pygame.draw.rect(surface, border_color, current_rect.inflate(pulse, pulse), 2, 3)
         
-        text_surf = font_medium.render(self.text, True, WHITE)
+        text_surf = render_text(font_medium, self.text, WHITE)
         text_rect = text_surf.get_rect(center=current_rect.center)
         surface.blit(text_surf, text_rect)
         
@@ -122,7 +123,7 @@ class VolumeSlider:
         slider_x = current_rect.x + int((self.value - self.min_val) / (self.max_val - self.min_val) * current_rect.width)
         pygame.draw.circle(surface, GREEN, (slider_x, current_rect.centery), current_rect.height // 2 - 2 + pulse)
 
-        label_surf = font_medium.render(f"{self.label}: {int(self.value * 100)}%", True, WHITE)
+        label_surf = render_text(font_medium, f"{self.label}: {int(self.value * 100)}%", WHITE)
         label_rect = label_surf.get_rect(midright=(current_rect.x - 10, current_rect.centery))
         surface.blit(label_surf, label_rect)
     
@@ -176,12 +177,12 @@ class KeybindButton:
         pygame.draw.rect(surface, button_color, current_rect.inflate(pulse, pulse), 0, 3)
         pygame.draw.rect(surface, WHITE, current_rect.inflate(pulse, pulse), 2, 3)
 
-        label_surf = font_medium.render(self.label, True, WHITE)
+        label_surf = render_text(font_medium, self.label, WHITE)
         label_rect = label_surf.get_rect(midright=(current_rect.x - 10, current_rect.centery))
         surface.blit(label_surf, label_rect)
 
         key_name = "Нажмите клавишу..." if self.waiting_for_input else self.get_key_name()
-        key_surf = font_medium.render(key_name, True, WHITE)
+        key_surf = render_text(font_medium, key_name, WHITE)
         key_rect = key_surf.get_rect(center=(current_rect.centerx, current_rect.centery))
         surface.blit(key_surf, key_rect)
     
@@ -2,8 +2,9 @@
 import pygame
 import random
 from pygame.locals import *
-from utils import load_font, get_resource_path, load_image
+from utils import load_font, get_resource_path, load_image, draw_overlay
 from menu_elements import PixelButton, VolumeSlider, KeybindButton
+from text_cache import render_text
 from settings_manager import SettingsManager
 
 # Цвета
@@ -67,9 +68,7 @@ class RainEffect:
             pygame.draw.line(surface, (130, 150, 180), start_pos, end_pos, 2)
             
         if self.flash_alpha > 0:
-            flash_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            flash_surface.fill((255, 255, 255, self.flash_alpha))
-            surface.blit(flash_surface, (0, 0))
+            draw_overlay(surface, (255, 255, 255), self.flash_alpha)
 
 class TextElement:
     def __init__(self, x_center, y, text, font, color=WHITE):
@@ -295,6 +294,11 @@ class OptionsScreen(BaseMenuScreen):
         self.window_scale_button = PixelButton(center_x - 100, y_offset, 200, 40, window_scale_text, BLUE, (62, 104, 148), action="toggle_window_scale")
         y_offset += 50
         self.elements.append(self.window_scale_button)
+
+        integer_scale_text = f"Целый масштаб: {'ВКЛ' if self.settings_manager.get_integer_scale() else 'ВЫКЛ'}"
+        self.integer_scale_button = PixelButton(center_x - 100, y_offset, 200, 40, integer_scale_text, BLUE, (62, 104, 148), action="toggle_integer_scale")
+        y_offset += 50
+        self.elements.append(self.integer_scale_button)
         
         current_mode = self.settings_manager.get_window_mode()
         window_mode_text = f"Окно: {self.window_mode_text_map.get(current_mode, 'Оконный')}"
@@ -342,6 +346,11 @@ class OptionsScreen(BaseMenuScreen):
                     self.settings_manager.set_particles_enabled(new_state)
                     self.particles_button.text = f"Частицы: {'ВКЛ' if new_state else 'ВЫКЛ'}"
                 
+                if action == "toggle_integer_scale":
+                    new_state = not self.settings_manager.get_integer_scale()
+                    self.settings_manager.set_integer_scale(new_state)
+                    self.integer_scale_button.text = f"Целый масштаб: {'ВКЛ' if new_state else 'ВЫКЛ'}"
+
                 if action == "toggle_window_mode":
                     current_mode = self.settings_manager.get_window_mode()
                     try:
@@ -425,10 +434,10 @@ class AuthorsScreen(BaseMenuScreen):
     def draw(self, dt):
         super().draw(dt, show_logo=False)
         center_x = self.width // 2
-        title = font_large.render("АВТОРЫ", True, WHITE)
+        title = render_text(font_large, "АВТОРЫ", WHITE)
         self.screen.blit(title, (center_x - title.get_width()//2, 80))
         for i, line in enumerate(self.authors_text_lines):
-            text_surf = font_medium.render(line, True, WHITE)
+            text_surf = render_text(font_medium, line, WHITE)
             text_rect = text_surf.get_rect(center=(center_x, 150 + i * 30))
             self.screen.blit(text_surf, text_rect)
         self.back_button.draw(self.screen, 0)
@@ -464,10 +473,8 @@ class PauseMenu(BaseMenuScreen):
     def draw(self, dt=0):
         if self.game_snapshot:
             self.screen.blit(self.game_snapshot, (0, 0))
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((20, 20, 20, 200))
-        self.screen.blit(overlay, (0, 0))
-        pause_text = font_large.render("ПАУЗА", True, WHITE)
+        draw_overlay(self.screen, (20, 20, 20), 200)
+        pause_text = render_text(font_large, "ПАУЗА", WHITE)
         self.screen.blit(pause_text, (self.width // 2 - pause_text.get_width() // 2, 100))
         for element in self.elements:
             element.draw(self.screen)
\ No newline at end of file
@@ -0,0 +1,128 @@
+# music.py
+# Фоновая музыка через потоковый pygame.mixer.music: трек декодируется по ходу
+# проигрывания, а не целиком в память, как pygame.mixer.Sound.
+
+import io
+import os
+import threading
+import pygame
+
+class MusicPlayer:
+    def __init__(self, volume=0.5, fade_time=0.5, enabled=True):
+        # Выключенный плеер ничего не читает и не играет (безголовый бенчмарк)
+        self.enabled = enabled
+        self.volume = volume
+        self.fade_time = fade_time
+        # Длительность текущего затухания: при остановке она может отличаться от смены трека
+        self.fade_out_time = fade_time
+        self.current = None
+        self.pending = None
+        self.fade_level = 0.0
+        self.fade_direction = 0
+        self.paused = False
+        # Сжатые файлы, заранее прочитанные в фоне: путь -> bytes
+        self.preloaded = {}
+        self.missing = set()
+        self.lock = threading.Lock()
+        self.stream = None
+
+    def preload(self, path):
+        # Читаем файл в фоновом потоке, чтобы смена трека не ждала диск
+        if not self.enabled: return
+        with self.lock:
+            if path in self.preloaded or path in self.missing: return
+            self.preloaded[path] = None
+        threading.Thread(target=self._read, args=(path,), daemon=True).start()
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f: data = f.read()
+        except OSError as e:
+            print(f"Не удалось загрузить музыку {path}: {e}")
+            with self.lock:
+                self.preloaded.pop(path, None)
+                self.missing.add(path)
+            return
+        with self.lock: self.preloaded[path] = data
+
+    def _start(self, path, loops=-1):
+        self.pending = None
+        with self.lock: data = self.preloaded.get(path)
+        try:
+            if data is not None:
+                # Поток держим живым, пока трек играет
+                self.stream = io.BytesIO(data)
+                pygame.mixer.music.load(self.stream, os.path.splitext(path)[1][1:])
+            else:
+                pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(0)
+            pygame.mixer.music.play(loops)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Не удалось включить музыку {path}: {e}")
+            self.missing.add(path)
+            self.current = None
+            self.fade_direction = 0
+            return
+        self.current = path
+        self.fade_level = 0.0
+        self.fade_direction = 1
+        self.paused = False
+
+    def play(self, path, loops=-1):
+        # Один поток на всю музыку, поэтому вместо наложения треков - затухание и нарастание
+        if not self.enabled or path in self.missing: return
+        if path == self.current and pygame.mixer.music.get_busy():
+            # Уже играет (или затухает ради другого трека) - просто возвращаем громкость
+            if self.fade_direction < 0:
+                self.pending = None
+                self.fade_direction = 1
+            return
+        if self.current is None or not pygame.mixer.music.get_busy():
+            self._start(path, loops)
+        else:
+            self.pending = path
+            self.fade_out_time = self.fade_time
+            self.fade_direction = -1
+
+    def stop(self, fade_time=0.0):
+        self.pending = None
+        if fade_time > 0 and self.current is not None:
+            self.fade_direction = -1
+            self.fade_out_time = fade_time
+            return
+        pygame.mixer.music.stop()
+        self.current = None
+        self.fade_direction = 0
+        self.fade_level = 0.0
+
+    def pause(self):
+        self.paused = True
+        pygame.mixer.music.pause()
+
+    def unpause(self):
+        self.paused = False
+        pygame.mixer.music.unpause()
+
+    def is_busy(self):
+        return self.pending is not None or pygame.mixer.music.get_busy()
+
+    def set_volume(self, volume):
+        self.volume = max(0.0, min(1.0, volume))
+        self._apply_volume()
+
+    def _apply_volume(self):
+        pygame.mixer.music.set_volume(self.volume * self.fade_level)
+
+    def update(self, dt):
+        if self.paused or self.fade_direction == 0: return
+        if self.fade_direction > 0:
+            self.fade_level = min(1.0, self.fade_level + dt / self.fade_time)
+            if self.fade_level >= 1.0: self.fade_direction = 0
+        else:
+            self.fade_level = max(0.0, self.fade_level - dt / self.fade_out_time)
+            if self.fade_level <= 0.0:
+                pygame.mixer.music.stop()
+                self.current = None
+                self.fade_direction = 0
+                if self.pending: self._start(self.pending)
+        self._apply_volume()
@@ -0,0 +1,84 @@
+# particles.py
+
+import random
+import numpy as np
+import pygame
+from utils import make_alpha_variant
+
+PARTICLE_SIZE = 8
+# 0.2 пикселя/кадр² при 60 FPS
+PARTICLE_GRAVITY = 0.2 * 60 * 60
+# Сколько заранее подготовленных ступеней прозрачности у каждого осколка
+ALPHA_STEPS = 8
+
+class ParticleSystem:
+    # Общая система осколков: состояние хранится в массивах NumPy и обновляется одним шагом
+    def __init__(self, rng=None):
+        self.rng = rng or random
+        self.images = []
+        self.image_index = {}
+        self.pos = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        self.age = np.zeros(0)
+        self.lifetime = np.zeros(0)
+        self.image_base = np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.age)
+
+    def _piece_images(self, source, x, y):
+        key = (id(source), x, y)
+        entry = self.image_index.get(key)
+        if entry is None:
+            piece = source.subsurface(pygame.Rect(x, y, PARTICLE_SIZE, PARTICLE_SIZE))
+            base = len(self.images)
+            for step in range(1, ALPHA_STEPS + 1):
+                self.images.append(make_alpha_variant(piece, round(255 * step / ALPHA_STEPS)))
+            # Держим ссылку на источник, чтобы его id не переиспользовался
+            entry = (base, source)
+            self.image_index[key] = entry
+        return entry[0]
+
+    def emit_tile(self, image, x, y):
+        width, height = image.get_size()
+        bases, positions, velocities, lifetimes = [], [], [], []
+        for i in range(0, width, PARTICLE_SIZE):
+            for j in range(0, height, PARTICLE_SIZE):
+                bases.append(self._piece_images(image, i, j))
+                positions.append((x + i, y + j))
+                velocities.append((self.rng.uniform(-2, 2) * 60, self.rng.uniform(-4, 0) * 60))
+                lifetimes.append(self.rng.uniform(0.8, 1.5))
+        if not bases: return
+        self.pos = np.concatenate((self.pos, np.array(positions, dtype=float)))
+        self.vel = np.concatenate((self.vel, np.array(velocities, dtype=float)))
+        self.age = np.concatenate((self.age, np.zeros(len(bases))))
+        self.lifetime = np.concatenate((self.lifetime, np.array(lifetimes, dtype=float)))
+        self.image_base = np.concatenate((self.image_base, np.array(bases, dtype=np.int32)))
+
+    def update(self, dt):
+        if not len(self.age): return
+        self.age += dt
+        self.pos += self.vel * dt
+        self.vel[:, 1] += PARTICLE_GRAVITY * dt
+        alive = self.age < self.lifetime
+        if not alive.all():
+            self.pos = self.pos[alive]
+            self.vel = self.vel[alive]
+            self.age = self.age[alive]
+            self.lifetime = self.lifetime[alive]
+            self.image_base = self.image_base[alive]
+
+    def clear(self):
+        keep = np.zeros(len(self.age), dtype=bool)
+        self.pos, self.vel = self.pos[keep], self.vel[keep]
+        self.age, self.lifetime, self.image_base = self.age[keep], self.lifetime[keep], self.image_base[keep]
+
+    def draw(self, surface, camera):
+        if not len(self.age): return
+        origin_x, origin_y = camera.apply(pygame.Rect(0, 0, 0, 0)).topleft
+        steps = np.clip(np.ceil((1 - self.age / self.lifetime) * ALPHA_STEPS), 1, ALPHA_STEPS).astype(np.int32)
+        indices = (self.image_base + steps - 1).tolist()
+        xs = (self.pos[:, 0].astype(np.int32) + origin_x).tolist()
+        ys = (self.pos[:, 1].astype(np.int32) + origin_y).tolist()
+        images = self.images
+        surface.fblits([(images[index], (x, y)) for index, x, y in zip(indices, xs, ys)])
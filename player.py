@@ -1,8 +1,12 @@
 # player.py
 
 import pygame
+import math
 from vine import Vine
 from tiles import BreakableTile
+from map_cache import TILE_DAMAGE
+from utils import make_alpha_variant
+from assets import assets
 
 # Константы физики
 GRAVITY = 1800 
@@ -13,6 +17,12 @@ KNOCKBACK_X_SPEED = 240
 KNOCKBACK_Y_SPEED = -360
 DASH_BASE_SPEED = 480
 DASH_JUMP_SPEED = -180
+BLINK_ALPHA = 128
+
+def _player_placeholder():
+    image = pygame.Surface((32, 64), pygame.SRCALPHA)
+    pygame.draw.polygon(image, (100, 100, 100), [(16, 0), (32, 64), (0, 64)])
+    return image
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, x, y, snd_hurt=None, snd_vine=None, snd_jump=None, particles_enabled=True):
@@ -22,13 +32,17 @@ class Player(pygame.sprite.Sprite):
         self.snd_vine = snd_vine
         self.snd_jump = snd_jump
         
-        try:
-            self.original_image = pygame.image.load("Sprites/player.png").convert_alpha()
-        except:
-            self.original_image = pygame.Surface((32, 64), pygame.SRCALPHA)
-            pygame.draw.polygon(self.original_image, (100, 100, 100), [(16, 0), (32, 64), (0, 64)])
+        self.original_image = assets.load("Sprites/player.png", _player_placeholder)
         
-        self.image = self.original_image.copy()
+        # Все варианты спрайта готовятся заранее: (смотрит вправо, мигает) -> поверхность
+        flipped_image = assets.load_flipped("Sprites/player.png", _player_placeholder)
+        self.images = {
+            (True, False): self.original_image,
+            (False, False): flipped_image,
+            (True, True): make_alpha_variant(self.original_image, BLINK_ALPHA),
+            (False, True): make_alpha_variant(flipped_image, BLINK_ALPHA),
+        }
+        self.image = self.original_image
         self.rect = self.image.get_rect(topleft=(x, y))
         
         self.x = float(self.rect.x)
@@ -193,8 +207,15 @@ class Player(pygame.sprite.Sprite):
             self.jump_buffer_timer = 0.0
             self.on_ground = False
 
+        self._refresh_image()
+
+    def _refresh_image(self):
+        # Мигаем только после удара: рывок тоже даёт неуязвимость, но мигать при нём не нужно
+        blinking = self.invincible and not self.dashing and math.sin(self.invincible_time * 40) > 0
+        self.image = self.images[(self.facing_right, blinking)]
+
     def _handle_horizontal_collisions(self, obstacles):
-        hit_list = pygame.sprite.spritecollide(self, obstacles, False)
+        hit_list = obstacles.query(self.rect)
         for obstacle in hit_list:
             if self.dashing and isinstance(obstacle, BreakableTile):
                 if obstacle.take_damage(self.dash_damage, self.particles_enabled):
@@ -213,7 +234,7 @@ class Player(pygame.sprite.Sprite):
 
     def _handle_vertical_collisions(self, obstacles, platforms, falling_tiles, world_height, dt):
         self.on_ground = False
-        hit_list = pygame.sprite.spritecollide(self, obstacles, False)
+        hit_list = obstacles.query(self.rect)
         for obstacle in hit_list:
             if self.velocity_y > 0:
                 self.rect.bottom = obstacle.rect.top
@@ -223,10 +244,10 @@ class Player(pygame.sprite.Sprite):
                 self.rect.top = obstacle.rect.bottom
                 self.velocity_y = 0
             self.y = float(self.rect.y)
-            if hasattr(obstacle, 'properties') and obstacle.properties.get('damage', 0) > 0:
-                self.take_damage(obstacle.properties['damage'], -1 if self.rect.centerx < obstacle.rect.centerx else 1)
+            if obstacle.flags & TILE_DAMAGE:
+                self.take_damage(obstacle.damage, -1 if self.rect.centerx < obstacle.rect.centerx else 1)
 
-        platform_hits = pygame.sprite.spritecollide(self, platforms, False)
+        platform_hits = platforms.query(self.rect)
         for platform in platform_hits:
             if self.velocity_y > 0 and (self.y + self.rect.height - self.velocity_y * dt) <= platform.rect.top + 5:
                 self.rect.bottom = platform.rect.top
@@ -234,7 +255,7 @@ class Player(pygame.sprite.Sprite):
                 self.velocity_y = 0
                 self.y = float(self.rect.y)
 
-        falling_hits = pygame.sprite.spritecollide(self, falling_tiles, False)
+        falling_hits = falling_tiles.query_rect(self.rect)
         for tile in falling_hits:
             if (tile.fall_on_stand and self.velocity_y >= 0 and (self.y + self.rect.height - self.velocity_y * dt) <= tile.rect.top + 5):
                 self.rect.bottom = tile.rect.top
@@ -258,11 +279,11 @@ class Player(pygame.sprite.Sprite):
     def flip_image(self, facing_right):
         if facing_right != self.facing_right:
             self.facing_right = facing_right
-            self.image = pygame.transform.flip(self.original_image, True, False) if not facing_right else self.original_image
+            self._refresh_image()
 
-    def draw_charge_bar(self, surface, camera):
+    def draw_charge_bar(self, surface, camera, draw_rect=None):
         if self.charge_bar_visible and self.is_charging:
-            screen_pos = camera.apply(self.rect).center + self.charge_bar_offset
+            screen_pos = (camera.apply(self.rect) if draw_rect is None else draw_rect).center + self.charge_bar_offset
             bg_rect = pygame.Rect(0, 0, self.charge_bar_width, self.charge_bar_height)
             bg_rect.center = screen_pos
             pygame.draw.rect(surface, (30, 30, 30), bg_rect, border_radius=5)
@@ -0,0 +1,66 @@
+# presentation.py
+
+import time
+import pygame
+
+class Presenter:
+    # Вывод логической поверхности в окно. Область назначения выделяется один раз:
+    # масштабирование идёт прямо в подповерхность экрана, рамки по краям чистятся
+    # только при смене размера окна.
+    def __init__(self, screen, logical_size, integer_scale=False):
+        self.screen = screen
+        self.logical_size = logical_size
+        # Только целые множители: пиксели одинакового размера ценой более широких рамок
+        self.integer_scale = integer_scale
+        self.display_size = None
+        self.scale = 1.0
+        self.offset = (0, 0)
+        self.size = logical_size
+        self.target = None
+        self.buffer = None
+        self.mode = "blit"
+        self.last_cost_ms = 0.0
+
+    def _layout(self):
+        self.display_size = self.screen.get_size()
+        scale = min(self.display_size[0] / self.logical_size[0], self.display_size[1] / self.logical_size[1])
+        if self.integer_scale and scale >= 1: scale = int(scale)
+        self.scale = scale
+        self.size = (int(self.logical_size[0] * scale), int(self.logical_size[1] * scale))
+        self.offset = ((self.display_size[0] - self.size[0]) // 2, (self.display_size[1] - self.size[1]) // 2)
+
+        if self.size == self.logical_size: self.mode = "blit"
+        elif scale == int(scale): self.mode = "integer"
+        else: self.mode = "scale"
+
+        self.screen.fill((0, 0, 0))
+        self.target = self.screen.subsurface(pygame.Rect(self.offset, self.size))
+        self.buffer = None
+
+    def set_integer_scale(self, enabled):
+        self.integer_scale = enabled
+        self.display_size = None
+
+    def _scale(self, source, dest):
+        # Целый множитель: каждый логический пиксель становится ровным квадратом scale x scale
+        if self.mode == "integer": pygame.transform.scale_by(source, int(self.scale), dest)
+        else: pygame.transform.scale(source, self.size, dest)
+
+    def _scale_into_target(self, source):
+        if self.buffer is None:
+            try:
+                self._scale(source, self.target)
+                return
+            except ValueError:
+                # Формат экрана не совпал с исходной поверхностью: масштабируем в свой буфер
+                self.buffer = pygame.Surface(self.size, 0, source)
+        self._scale(source, self.buffer)
+        self.target.blit(self.buffer, (0, 0))
+
+    def present(self, source):
+        start = time.perf_counter()
+        if self.screen.get_size() != self.display_size: self._layout()
+        if self.mode == "blit": self.target.blit(source, (0, 0))
+        else: self._scale_into_target(source)
+        self.last_cost_ms = (time.perf_counter() - start) * 1000
+        pygame.display.flip()
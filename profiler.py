@@ -0,0 +1,126 @@
+# profiler.py
+
+import json
+import time
+from collections import deque
+import pygame
+from utils import load_font
+from text_cache import GlyphAtlas
+
+# Цвета фаз на графике поверх игры
+PHASE_COLORS = {
+    "input": (90, 170, 255),
+    "update": (90, 220, 120),
+    "render": (255, 200, 70),
+    "present": (240, 110, 200),
+    "tick": (110, 110, 110),
+}
+# Ограничение трассы, чтобы забытый включённым профайлер не съел память
+MAX_TRACE_EVENTS = 500000
+
+class _NullSection:
+    def __enter__(self): return self
+    def __exit__(self, *exc_info): return False
+
+_NULL_SECTION = _NullSection()
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.profiler.add_sample(self.name, end - self.start)
+        if self.profiler.tracing: self.profiler.add_trace_event(self.name, self.start, end)
+        return False
+
+class FrameProfiler:
+    # Замеряет фазы кадра. Выключенный профайлер отдаёт пустой контекст и почти ничего не стоит.
+    def __init__(self, enabled=False, history=None, tracing=False):
+        self.enabled = enabled
+        self.current = {}
+        # history ограничивает число хранимых кадров (для графика), None - хранить все
+        self.frames = deque(maxlen=history) if history else []
+        self.tracing = tracing
+        self.trace_events = []
+        self.origin = time.perf_counter()
+        self.glyphs = {}
+
+    def section(self, name):
+        if not self.enabled: return _NULL_SECTION
+        return _Section(self, name)
+
+    def add_sample(self, name, seconds):
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        if not self.enabled: return
+        self.frames.append(self.current)
+        self.current = {}
+
+    def add_trace_event(self, name, start, end):
+        if len(self.trace_events) >= MAX_TRACE_EVENTS: return
+        # Формат Chrome trace events (chrome://tracing, Perfetto), время в микросекундах
+        self.trace_events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                                  "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6})
+
+    def write_trace(self, path):
+        with open(path, "w") as f: json.dump({"traceEvents": self.trace_events, "displayTimeUnit": "ms"}, f)
+
+    def reset(self):
+        self.current = {}
+        self.frames.clear()
+        self.trace_events = []
+
+    def draw(self, surface, phases=tuple(PHASE_COLORS), pos=(8, 40), height=60, budget_ms=1000 / 60):
+        # Скользящий график: столбик на кадр, фазы друг над другом, линия - бюджет кадра
+        x0, y0 = pos
+        frames = list(self.frames)[-120:]
+        width = 2 * len(frames)
+        scale = height / (2 * budget_ms)
+        for i, frame in enumerate(frames):
+            bottom = y0 + height
+            for name in phases:
+                bar = min(bottom - y0, frame.get(name, 0.0) * 1000.0 * scale)
+                if bar >= 1:
+                    pygame.draw.rect(surface, PHASE_COLORS.get(name, (200, 200, 200)), (x0 + 2 * i, bottom - bar, 2, bar))
+                    bottom -= bar
+        pygame.draw.line(surface, (255, 60, 60), (x0, y0 + height - budget_ms * scale), (x0 + max(width, 240), y0 + height - budget_ms * scale))
+
+        last = frames[-1] if frames else {}
+        for i, name in enumerate(phases):
+            # Цифры меняются каждый кадр, поэтому подписи собираются из глифов, а не кэшируются строками
+            glyphs = self.glyphs.get(name)
+            if glyphs is None:
+                glyphs = self.glyphs[name] = GlyphAtlas(load_font("munro.otf", 16), PHASE_COLORS.get(name, (200, 200, 200)))
+            glyphs.draw(surface, f"{name} {last.get(name, 0.0) * 1000.0:.2f}", (x0 + 250, y0 + i * 14))
+
+    def summary(self):
+        samples = {}
+        for frame in self.frames:
+            for name, seconds in frame.items():
+                samples.setdefault(name, []).append(seconds * 1000.0)
+        return {name: describe(values) for name, values in samples.items()}
+
+def percentile(sorted_values, fraction):
+    if not sorted_values: return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def describe(values_ms):
+    ordered = sorted(values_ms)
+    return {
+        "samples": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p95_ms": percentile(ordered, 0.95),
+        "p99_ms": percentile(ordered, 0.99),
+        "max_ms": ordered[-1] if ordered else 0.0,
+    }
@@ -0,0 +1,88 @@
+# projectiles.py
+
+import numpy as np
+import pygame
+
+PROJECTILE_SIZE = 10
+PROJECTILE_COLOR = (255, 0, 255)
+# Раньше каждый снаряд обновлялся дважды за тик (группой призрака и группой игры),
+# поэтому при скорости 300 он жил 3 секунды игрового таймера, то есть 1.5 секунды на деле
+PROJECTILE_LIFETIME = 1.5
+
+class ProjectilePool:
+    # Снаряды врагов в массивах фиксированной ёмкости: живые лежат подряд в первых count ячейках,
+    # шаг, проверка стен и отрисовка идут одним проходом по массивам с общей картинкой
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.age = np.zeros(capacity)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        # Целочисленные левые верхние углы, как у rect спрайта, и они же на прошлом тике для интерполяции
+        self.rects = np.zeros((capacity, 2), dtype=np.int64)
+        self.previous = np.zeros((capacity, 2), dtype=np.int64)
+        self.image = pygame.Surface((PROJECTILE_SIZE, PROJECTILE_SIZE), pygame.SRCALPHA)
+        pygame.draw.circle(self.image, PROJECTILE_COLOR, (PROJECTILE_SIZE // 2, PROJECTILE_SIZE // 2), PROJECTILE_SIZE // 2)
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, velocity_x, velocity_y, damage):
+        # Пул полон - новый снаряд просто не появляется
+        if self.count >= self.capacity: return False
+        i = self.count
+        self.pos[i] = (x, y)
+        self.vel[i] = (velocity_x, velocity_y)
+        self.age[i] = 0.0
+        self.damage[i] = damage
+        self.rects[i] = self.previous[i] = (round(x), round(y))
+        self.count += 1
+        return True
+
+    def update(self, obstacle_grid, player, dt):
+        n = self.count
+        if not n: return
+        if dt > 0.1: dt = 0.1
+
+        age = self.age[:n]
+        age += dt
+        pos = self.pos[:n]
+        pos += self.vel[:n] * dt
+        rects = self.rects[:n]
+        rects[:] = np.rint(pos)
+        xs, ys = rects[:, 0], rects[:, 1]
+
+        alive = age < PROJECTILE_LIFETIME
+        alive &= ~obstacle_grid.solid_under(xs, ys, PROJECTILE_SIZE, PROJECTILE_SIZE)
+        player_rect = player.rect
+        hits = alive & (xs < player_rect.right) & (xs + PROJECTILE_SIZE > player_rect.left) \
+                     & (ys < player_rect.bottom) & (ys + PROJECTILE_SIZE > player_rect.top)
+        for i in np.flatnonzero(hits).tolist():
+            knockback_dir = 1 if player_rect.centerx > int(xs[i]) + PROJECTILE_SIZE // 2 else -1
+            player.take_damage(int(self.damage[i]), knockback_dir)
+        alive &= ~hits
+
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            count = len(keep)
+            for array in (self.pos, self.vel, self.age, self.damage, self.rects, self.previous):
+                array[:count] = array[keep]
+            self.count = count
+
+    def store_previous(self):
+        self.previous[:self.count] = self.rects[:self.count]
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self, surface, camera, alpha=1.0):
+        n = self.count
+        if not n: return
+        origin_x, origin_y = camera.apply(pygame.Rect(0, 0, 0, 0)).topleft
+        rects = self.rects[:n]
+        if alpha < 1.0:
+            previous = self.previous[:n]
+            rects = np.rint(previous + (rects - previous) * alpha).astype(np.int64)
+        image = self.image
+        surface.fblits([(image, (x + origin_x, y + origin_y)) for x, y in rects.tolist()])
@@ -0,0 +1,119 @@
+# replay.py
+# Запись и воспроизведение ввода по тикам симуляции.
+# Файл: сигнатура, заголовок JSON (зерно, карта, управление) и сжатый zlib поток тиков.
+# Тик: маска зажатых клавиш, число нажатий, коды нажатых клавиш (varint).
+
+import json
+import struct
+import zlib
+import pygame
+
+MAGIC = b"KREP"
+VERSION = 1
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80: return value, pos
+        shift += 7
+
+def tracked_keys(controls):
+    # Клавиши, которые Game читает как зажатые: движение, заряд и ENTER для рестарта
+    return [controls.get('move_left', -1), controls.get('move_right', -1), controls.get('charge', -1), pygame.K_RETURN]
+
+class ReplayKeys:
+    # Подменяет pygame.key.get_pressed() для Game.handle_input
+    def __init__(self, pressed):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+class InputRecorder:
+    def __init__(self, seed, controls, map_path, particles_enabled):
+        self.header = {
+            "version": VERSION,
+            "seed": seed,
+            "controls": dict(controls),
+            "map": map_path,
+            "particles": particles_enabled,
+        }
+        self.keys = tracked_keys(controls)
+        self.body = bytearray()
+        self.pending_events = []
+        self.ticks = 0
+
+    def record_event(self, event):
+        # Нажатие относится к ближайшему следующему тику: до него Game его и обработает
+        if event.type == pygame.KEYDOWN: self.pending_events.append(event.key)
+
+    def record_tick(self, keys):
+        mask = 0
+        for bit, key in enumerate(self.keys):
+            if key >= 0 and keys[key]: mask |= 1 << bit
+        self.body.append(mask)
+        _write_varint(self.body, len(self.pending_events))
+        for key in self.pending_events: _write_varint(self.body, key)
+        self.pending_events = []
+        self.ticks += 1
+
+    def save(self, path):
+        header = json.dumps(dict(self.header, ticks=self.ticks)).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            f.write(zlib.compress(bytes(self.body), 9))
+
+class InputReplay:
+    def __init__(self, header, body):
+        self.header = header
+        self.seed = header["seed"]
+        self.controls = dict(header["controls"])
+        self.map_path = header["map"]
+        self.particles_enabled = header["particles"]
+        self.keys = tracked_keys(self.controls)
+        self.body = body
+        self.pos = 0
+        self.tick = 0
+        self.total_ticks = header.get("ticks", 0)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f: data = f.read()
+        if data[:4] != MAGIC: raise ValueError(f"{path}: не файл записи ввода")
+        header_length = struct.unpack_from("<I", data, 4)[0]
+        header = json.loads(data[8:8 + header_length].decode("utf-8"))
+        if header.get("version") != VERSION: raise ValueError(f"{path}: неподдерживаемая версия {header.get('version')}")
+        return cls(header, zlib.decompress(data[8 + header_length:]))
+
+    def __len__(self):
+        return self.total_ticks
+
+    def finished(self):
+        return self.pos >= len(self.body)
+
+    def next_tick(self):
+        # -> (список событий KEYDOWN, зажатые клавиши) для следующего тика
+        mask = self.body[self.pos]
+        count, self.pos = _read_varint(self.body, self.pos + 1)
+        events = []
+        for _ in range(count):
+            key, self.pos = _read_varint(self.body, self.pos)
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+        self.tick += 1
+        pressed = {key for bit, key in enumerate(self.keys) if mask & (1 << bit)}
+        return events, ReplayKeys(pressed)
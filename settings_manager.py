@@ -27,7 +27,8 @@ class SettingsManager:
                 'aspect_ratio': '4:3',
                 'max_fps': '60',
                 'window_mode': 'windowed',
-                'window_scale': '2'  # НОВАЯ НАСТРОЙКА
+                'window_scale': '2',  # НОВАЯ НАСТРОЙКА
+                'integer_scale': 'false'
             }
         }
         self.load_settings()
@@ -117,4 +118,11 @@ class SettingsManager:
 
     def set_window_scale(self, scale_str):
         self.config['display']['window_scale'] = str(scale_str)
+        self.save_settings()
+
+    def get_integer_scale(self):
+        return self.config['display'].get('integer_scale', 'false').lower() == 'true'
+
+    def set_integer_scale(self, enabled):
+        self.config['display']['integer_scale'] = 'true' if enabled else 'false'
         self.save_settings()
\ No newline at end of file
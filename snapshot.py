@@ -0,0 +1,45 @@
+# snapshot.py
+
+import pygame
+
+# Метка для атрибутов-групп: при восстановлении группа просто очищается
+_EMPTY_GROUP = object()
+# Служебное поле pygame.sprite.Sprite со списком групп; членство восстанавливается отдельно
+_SPRITE_GROUPS = "_Sprite__g"
+
+def _copy_value(value):
+    if isinstance(value, (pygame.Rect, pygame.math.Vector2, list, dict, set)): return value.copy()
+    return value
+
+def capture_state(obj):
+    state = {}
+    for key, value in obj.__dict__.items():
+        if key == _SPRITE_GROUPS: continue
+        if isinstance(value, pygame.sprite.AbstractGroup): state[key] = _EMPTY_GROUP
+        else: state[key] = _copy_value(value)
+    return state
+
+def restore_state(obj, state):
+    attributes = obj.__dict__
+    for key in [key for key in attributes if key not in state and key != _SPRITE_GROUPS]: del attributes[key]
+    for key, value in state.items():
+        if value is _EMPTY_GROUP: attributes[key].empty()
+        else: attributes[key] = _copy_value(value)
+
+class WorldSnapshot:
+    # Мир сразу после загрузки: поля объектов, состав групп и сеток коллизий.
+    # Сброс возвращает всё на место, не загружая заново карту, спрайты и шрифты.
+    def __init__(self, entities, groups=(), grids=()):
+        self.states = [(entity, capture_state(entity)) for entity in entities]
+        self.groups = [(group, group.sprites()) for group in groups]
+        self.grids = [(grid, list(grid.members)) for grid in grids]
+
+    def restore(self):
+        for entity, state in self.states: restore_state(entity, state)
+        for group, members in self.groups:
+            group.empty()
+            group.add(*members)
+        for grid, members in self.grids:
+            captured = set(members)
+            for sprite in [sprite for sprite in grid.members if sprite not in captured]: grid.remove(sprite)
+            for sprite in members: grid.add(sprite)
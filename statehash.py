@@ -0,0 +1,81 @@
+# statehash.py
+# Хэш состояния симуляции на каждом тике: оптимизированная сборка, прогнанная на той же
+# записи ввода (replay.py), должна выдать тот же поток хэшей, что и эталонная.
+# Сравнение: python statehash.py reference.hash candidate.hash
+
+import hashlib
+import sys
+from projectiles import PROJECTILE_SIZE
+
+# Части состояния хэшируются по отдельности, чтобы было видно, что именно разошлось
+COMPONENTS = ["player", "enemies", "tiles", "projectiles", "particles"]
+DIGEST_SIZE = 4
+RECORD_SIZE = DIGEST_SIZE * len(COMPONENTS)
+
+def _digest(values):
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+def state_components(game):
+    player = game.player
+    loader = game.map_loader
+    particles = loader.particles
+    return [
+        (tuple(player.rect), player.x, player.y, player.velocity_x, player.velocity_y, player.current_health,
+         player.on_ground, player.dashing, player.is_charging, player.charge_power, player.facing_right),
+        [(tuple(enemy.rect), enemy.x, enemy.y, enemy.velocity_x, enemy.velocity_y, enemy.state,
+          enemy.current_health, enemy.dying, enemy.current_frame) for enemy in game.enemies],
+        ([tuple(tile.rect) for tile in loader.breakable_tiles],
+         [(tuple(tile.rect), tile.visible, tile.falling, tile.shaking) for tile in loader.falling_tiles],
+         [tuple(coin.rect) for coin in loader.collectables],
+         [tuple(tile.rect) for tile in loader.healing_tiles]),
+        # Тот же вид, что был у списка rect спрайтов-снарядов
+        [(x, y, PROJECTILE_SIZE, PROJECTILE_SIZE) for x, y in game.projectiles.rects[:game.projectiles.count].tolist()],
+        (len(particles), particles.pos.tobytes(), particles.age.tobytes()),
+    ]
+
+def hash_state(game):
+    return b"".join(_digest(component) for component in state_components(game))
+
+class StateHashWriter:
+    # Пишет по RECORD_SIZE байт на тик
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.ticks = 0
+
+    def record(self, game):
+        self.file.write(hash_state(game))
+        self.ticks += 1
+
+    def close(self):
+        self.file.close()
+
+def read_hashes(path):
+    with open(path, "rb") as f: data = f.read()
+    return [data[i:i + RECORD_SIZE] for i in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE)]
+
+def first_difference(reference, candidate):
+    # -> (тик, список разошедшихся частей) или None, если общая часть совпадает
+    for tick, (a, b) in enumerate(zip(reference, candidate)):
+        if a != b:
+            differing = [name for i, name in enumerate(COMPONENTS)
+                         if a[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE] != b[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]]
+            return tick, differing
+    return None
+
+def main():
+    if len(sys.argv) != 3:
+        print("usage: python statehash.py reference.hash candidate.hash", file=sys.stderr)
+        sys.exit(2)
+    reference, candidate = read_hashes(sys.argv[1]), read_hashes(sys.argv[2])
+    difference = first_difference(reference, candidate)
+    if difference:
+        tick, differing = difference
+        print(f"DIVERGED at tick {tick}: {', '.join(differing)}")
+        sys.exit(1)
+    if len(reference) != len(candidate):
+        print(f"DIVERGED: identical for {min(len(reference), len(candidate))} ticks, lengths {len(reference)} vs {len(candidate)}")
+        sys.exit(1)
+    print(f"OK: {len(reference)} ticks identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# text_cache.py
+
+from collections import OrderedDict
+
+class TextCache:
+    # LRU уже отрендеренных строк: (шрифт, текст, цвет, сглаживание) -> поверхность.
+    # Поверхности общие, поэтому альфа выставляется при каждом запросе.
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True, alpha=255):
+        key = (id(font), text, tuple(color), antialias)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            # Ссылка на шрифт держит его живым, чтобы id в ключе не переиспользовался
+            entry = [font.render(text, antialias, color), font, 255]
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries: self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        alpha = int(alpha)
+        if entry[2] != alpha:
+            entry[0].set_alpha(alpha)
+            entry[2] = alpha
+        return entry[0]
+
+    def clear(self):
+        self.entries.clear()
+
+class GlyphAtlas:
+    # Для часто меняющихся счётчиков ("x 12"): строка собирается из заранее отрендеренных символов
+    def __init__(self, font, color, antialias=True):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.glyphs = {}
+        self.alpha = 255
+
+    def _glyph(self, char):
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.font.render(char, self.antialias, self.color)
+            if self.alpha != 255: glyph.set_alpha(self.alpha)
+            self.glyphs[char] = glyph
+        return glyph
+
+    def _set_alpha(self, alpha):
+        alpha = int(alpha)
+        if alpha == self.alpha: return
+        self.alpha = alpha
+        for glyph in self.glyphs.values(): glyph.set_alpha(alpha)
+
+    def size(self, text):
+        glyphs = [self._glyph(char) for char in text]
+        return sum(glyph.get_width() for glyph in glyphs), max((glyph.get_height() for glyph in glyphs), default=0)
+
+    def draw(self, surface, text, pos, alpha=255):
+        self._set_alpha(alpha)
+        x, y = pos
+        blits = []
+        for char in text:
+            glyph = self._glyph(char)
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surface.fblits(blits)
+
+text_cache = TextCache()
+
+def render_text(font, text, color, antialias=True, alpha=255):
+    return text_cache.render(font, text, color, antialias, alpha)
@@ -1,17 +1,56 @@
 # tiles.py
 
+import numpy as np
 import pygame
-import xml.etree.ElementTree as ET
-import os
-import random
+from array import array
+from collections import OrderedDict
+from map_cache import load_compiled_map, is_mergeable, TILE_SPECIAL, TILE_PLAYER_SPAWN, TILE_ENEMY, TILE_COLLECTABLE, TILE_FALL, TILE_BREAKABLE, TILE_HEALING, TILE_COLLIDABLE, TILE_PLATFORM
+from assets import assets
+from camera import LOGICAL_WIDTH, LOGICAL_HEIGHT
+from particles import ParticleSystem
 from enemies import MeleeGhost, RangedGhost, EtherJumperBoss
 
+class TileType:
+    # Общая запись на gid: статичные клетки карты хранят только gid в массиве слоя и ссылаются сюда
+    __slots__ = ("gid", "image", "properties", "flags")
+
+    def __init__(self, gid, image, properties, flags):
+        self.gid = gid
+        self.image = image
+        self.properties = properties
+        self.flags = flags
+
 class Tile(pygame.sprite.Sprite):
-    def __init__(self, image, x, y, properties=None):
+    def __init__(self, image, x, y, properties=None, flags=0, damage=0):
         super().__init__()
         self.image = image
         self.rect = self.image.get_rect(topleft=(x, y))
         self.properties = properties or {}
+        # Биты свойств и урон из таблиц карты по gid, для проверок при столкновениях
+        self.flags = flags
+        self.damage = damage
+
+class Collider(pygame.sprite.Sprite):
+    # Несколько соседних стен, слитых в один прямоугольник при компиляции карты. Картинки нет: стены рисуются чанками
+    def __init__(self, rect, properties=None, flags=0):
+        super().__init__()
+        self.rect = rect
+        self.properties = properties or {}
+        self.flags = flags
+        self.damage = 0
+
+class ColliderCell:
+    # Клетка слитого коллайдера: TileGrid хранит их при add() и отдаёт из query вместо самого коллайдера.
+    # Выталкивание идёт до края клетки, как было с отдельными тайлами: край всего коллайдера
+    # может быть за сотни пикселей, и застрявшую сущность перебросило бы через пол-уровня.
+    __slots__ = ("rect", "collider", "properties", "flags", "damage")
+
+    def __init__(self, rect, collider):
+        self.rect = rect
+        self.collider = collider
+        self.properties = collider.properties
+        self.flags = collider.flags
+        self.damage = collider.damage
 
 class CollectableTile(pygame.sprite.Sprite):
     def __init__(self, image, x, y):
@@ -27,6 +66,11 @@ class PlatformTile(pygame.sprite.Sprite):
         self.properties = properties or {}
 
 class FallingTile(pygame.sprite.Sprite):
+    SHAKE_TIME = 0.5
+    # Смещения тряски по шагам в 1/60 секунды - та же последовательность, что была покадрово при 60 FPS
+    SHAKE_OFFSETS = (0, -1, -2, 1)
+    FALL_SPEED = 300
+
     def __init__(self, image, x, y, fall_on_stand, fall_on_pass_under, respawn_time):
         super().__init__()
         self.original_image = image
@@ -41,13 +85,17 @@ class FallingTile(pygame.sprite.Sprite):
         self.fall_timer = 0.0
         self.respawn_timer = 0.0
         self.original_pos = (x, y)
+        # Дробная высота при падении, rect получает округлённую
+        self.y = float(y)
         self.visible = True
         self.shake_offset = 0
+        # SpatialHash карты; плитка сама перекладывается в нём, когда сдвигается
+        self.grid = None
 
     def start_shaking(self):
         if not self.falling and not self.shaking:
             self.shaking = True
-            self.shake_timer = 0.5
+            self.shake_timer = self.SHAKE_TIME
 
     def update(self, dt):
         if not self.visible:
@@ -57,11 +105,14 @@ class FallingTile(pygame.sprite.Sprite):
                 self.falling = False
                 self.shaking = False
                 self.rect.topleft = self.original_pos
+                self.y = float(self.original_pos[1])
+                if self.grid: self.grid.add(self)
             return
 
         if self.shaking:
             self.shake_timer -= dt
-            self.shake_offset = (self.shake_offset + 1) % 4 - 2
+            step = int((self.SHAKE_TIME - self.shake_timer) * 60 + 1e-6)
+            self.shake_offset = self.SHAKE_OFFSETS[step % 4]
             self.rect.x = self.original_pos[0] + self.shake_offset
             if self.shake_timer <= 0:
                 self.shaking = False
@@ -69,12 +120,14 @@ class FallingTile(pygame.sprite.Sprite):
                 self.rect.x = self.original_pos[0]
         
         if self.falling:
-            self.rect.y += 300 * dt
+            self.y += self.FALL_SPEED * dt
+            self.rect.y = round(self.y)
             if self.rect.top > self.original_pos[1] + 600:
                 self.visible = False
+        if (self.shaking or self.falling) and self.grid: self.grid.add(self)
 
 class BreakableTile(pygame.sprite.Sprite):
-    def __init__(self, image, x, y, properties=None):
+    def __init__(self, image, x, y, properties=None, particle_system=None, flags=0, damage=0):
         super().__init__()
         self.original_image = image
         self.image = image.copy()
@@ -82,8 +135,10 @@ class BreakableTile(pygame.sprite.Sprite):
         self.properties = properties or {}
         self.health = self.properties.get('health', 1)
         self.broken = False
-        self.particles = []
+        self.particle_system = particle_system
         self.collidable = self.properties.get('collidable', True)
+        self.flags = flags
+        self.damage = damage
         
     def take_damage(self, amount, particles_enabled=True):
         if not self.broken and self.collidable:
@@ -101,35 +156,15 @@ class BreakableTile(pygame.sprite.Sprite):
             self.create_particles()
         
     def create_particles(self):
-        width, height = self.original_image.get_size()
-        particle_size = 8
-        for i in range(0, width, particle_size):
-            for j in range(0, height, particle_size):
-                particle_img = self.original_image.subsurface(pygame.Rect(i, j, particle_size, particle_size))
-                self.particles.append({
-                    'image': particle_img, 'pos': [self.rect.x + i, self.rect.y + j],
-                    'velocity': [random.uniform(-2, 2), random.uniform(-4, 0)],
-                    'gravity': 0.2, 'lifetime': random.uniform(0.8, 1.5), 'timer': 0
-                })
+        # Осколки живут в общей ParticleSystem карты, сама плитка после разрушения больше не нужна
+        if self.particle_system: self.particle_system.emit_tile(self.original_image, self.rect.x, self.rect.y)
     
     def update(self, dt):
-        if self.broken:
-            if not self.particles: self.kill()
-            for p in self.particles[:]:
-                p['timer'] += dt
-                p['pos'][0] += p['velocity'][0] 
-                p['pos'][1] += p['velocity'][1]
-                p['velocity'][1] += p['gravity']
-                if p['timer'] >= p['lifetime']: self.particles.remove(p)
+        if self.broken: self.kill()
     
     def draw(self, surface, camera):
         if not self.broken:
             surface.blit(self.image, camera.apply(self.rect))
-        else:
-            for p in self.particles:
-                alpha = max(0, 255 * (1 - p['timer'] / p['lifetime']))
-                img_copy = p['image'].copy(); img_copy.set_alpha(alpha)
-                surface.blit(img_copy, camera.apply(pygame.Rect(p['pos'], p['image'].get_size())))
 
 class HealingTile(Tile):
     def __init__(self, image, x, y, properties=None):
@@ -159,8 +194,229 @@ class HealingTile(Tile):
             temp_image.fill((100, 100, 100, 150), special_flags=pygame.BLEND_RGBA_MULT)
             surface.blit(temp_image, camera.apply(self.rect))
 
+class TileGrid:
+    # Равномерная сетка по клеткам тайлов: вместо перебора всей группы смотрим только клетки под rect.
+    # Группа держится в синхроне, чтобы остальной код по-прежнему мог с ней работать.
+    def __init__(self, map_width, map_height, tile_width, tile_height, group=None):
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.cols = max(1, -(-map_width // tile_width))
+        self.rows = max(1, -(-map_height // tile_height))
+        self.group = group if group is not None else pygame.sprite.Group()
+        self.cells = {}
+        self.members = {}
+        # Число тайлов в каждой клетке - для пакетных проверок массивами (снаряды)
+        self.solid = np.zeros((self.rows, self.cols), dtype=np.int32)
+
+    def _cell_indices(self, rect):
+        x0 = max(0, rect.left // self.tile_width)
+        x1 = min(self.cols - 1, (rect.right - 1) // self.tile_width)
+        y0 = max(0, rect.top // self.tile_height)
+        y1 = min(self.rows - 1, (rect.bottom - 1) // self.tile_height)
+        return [cy * self.cols + cx for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)]
+
+    def _cell_rect(self, index):
+        return pygame.Rect(index % self.cols * self.tile_width, index // self.cols * self.tile_height, self.tile_width, self.tile_height)
+
+    def add(self, sprite):
+        if sprite in self.members: return
+        # В клетках лежат записи: сам спрайт или, для слитого коллайдера, его клетка
+        if isinstance(sprite, Collider):
+            entries = [(index, ColliderCell(self._cell_rect(index), sprite)) for index in self._cell_indices(sprite.rect)]
+        else:
+            entries = [(index, sprite) for index in self._cell_indices(sprite.rect)]
+        self.members[sprite] = entries
+        for index, entry in entries:
+            self.cells.setdefault(index, []).append(entry)
+            self.solid.flat[index] += 1
+        self.group.add(sprite)
+
+    def remove(self, sprite):
+        entries = self.members.pop(sprite, None)
+        if entries is not None:
+            for index, entry in entries:
+                cell = self.cells[index]
+                cell.remove(entry)
+                if not cell: del self.cells[index]
+                self.solid.flat[index] -= 1
+        self.group.remove(sprite)
+
+    def __contains__(self, sprite):
+        return sprite in self.members
+
+    def __len__(self):
+        return len(self.members)
+
+    def query(self, rect):
+        hits = []
+        for index in self._cell_indices(rect):
+            for entry in self.cells.get(index, ()):
+                if entry not in hits and entry.rect.colliderect(rect):
+                    hits.append(entry)
+        return hits
+
+    def solid_under(self, xs, ys, width, height):
+        # Массивы левых верхних углов -> есть ли тайл под каждым rect. Тайлы занимают клетку целиком,
+        # так что занятая клетка и есть касание; rect не больше клетки, хватает четырёх углов.
+        x0 = np.maximum(0, xs // self.tile_width)
+        x1 = np.minimum(self.cols - 1, (xs + width - 1) // self.tile_width)
+        y0 = np.maximum(0, ys // self.tile_height)
+        y1 = np.minimum(self.rows - 1, (ys + height - 1) // self.tile_height)
+        inside = (x0 <= x1) & (y0 <= y1)
+        x0, x1 = np.minimum(x0, self.cols - 1), np.maximum(x1, 0)
+        y0, y1 = np.minimum(y0, self.rows - 1), np.maximum(y1, 0)
+        solid = self.solid
+        return inside & ((solid[y0, x0] > 0) | (solid[y0, x1] > 0) | (solid[y1, x0] > 0) | (solid[y1, x1] > 0))
+
+class SpatialHash:
+    # Хэш-сетка для подвижных спрайтов (монеты, враги, падающие плитки). В отличие от TileGrid
+    # спрайт может двигаться: add() для уже добавленного перекладывает его, только если rect сменил клетки.
+    def __init__(self, cell_size=64, group=None):
+        self.cell_size = cell_size
+        self.group = group if group is not None else pygame.sprite.Group()
+        self.cells = {}
+        # спрайт -> (x0, y0, x1, y1) занятых клеток
+        self.members = {}
+        # Порядок добавления: результаты запросов не зависят от порядка обхода клеток
+        self.order = {}
+        self.next_order = 0
+
+    def _span(self, rect):
+        size = self.cell_size
+        return (rect.left // size, rect.top // size, max(rect.left, rect.right - 1) // size, max(rect.top, rect.bottom - 1) // size)
+
+    def _cells(self, span):
+        x0, y0, x1, y1 = span
+        return [(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)]
+
+    def add(self, sprite):
+        span = self._span(sprite.rect)
+        previous = self.members.get(sprite)
+        if previous == span: return
+        if previous is None:
+            self.order[sprite] = self.next_order
+            self.next_order += 1
+            self.group.add(sprite)
+        else:
+            for key in self._cells(previous): self._discard(key, sprite)
+        self.members[sprite] = span
+        for key in self._cells(span): self.cells.setdefault(key, {})[sprite] = None
+
+    def _discard(self, key, sprite):
+        cell = self.cells[key]
+        del cell[sprite]
+        if not cell: del self.cells[key]
+
+    def remove(self, sprite):
+        span = self.members.pop(sprite, None)
+        if span is not None:
+            for key in self._cells(span): self._discard(key, sprite)
+            del self.order[sprite]
+        self.group.remove(sprite)
+
+    def __contains__(self, sprite):
+        return sprite in self.members
+
+    def __len__(self):
+        return len(self.members)
+
+    def query_rect(self, rect):
+        found = {}
+        for key in self._cells(self._span(rect)):
+            for sprite in self.cells.get(key, ()):
+                if sprite not in found and sprite.rect.colliderect(rect): found[sprite] = None
+        if len(found) < 2: return list(found)
+        return sorted(found, key=self.order.__getitem__)
+
+    def query_pairs(self, sprites):
+        # -> [(спрайт из sprites, пересекающийся с ним спрайт сетки)], как groupcollide
+        return [(sprite, other) for sprite in sprites for other in self.query_rect(sprite.rect)]
+
+class StaticChunkCache:
+    # Статичные тайлы рендерятся кусками размером с экран только при первом попадании в кадр.
+    # Готовые чанки живут в LRU, пока укладываются в бюджет памяти.
+    def __init__(self, map_width, map_height, tile_types, tile_width, tile_height, chunk_width=LOGICAL_WIDTH, chunk_height=LOGICAL_HEIGHT, memory_budget=16 * 1024 * 1024):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.tile_types = tile_types
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.chunk_width = chunk_width
+        self.chunk_height = chunk_height
+        self.memory_budget = memory_budget
+        # Слои (ширина, массив gid); чанк собирается прямо из них
+        self.layers = []
+        self.occupied = set()
+        self.chunks = OrderedDict()
+        self.memory_used = 0
+
+    def add_layer(self, width, gids):
+        self.layers.append((width, gids))
+        tw, th = self.tile_width, self.tile_height
+        for index, gid in enumerate(gids):
+            if not gid: continue
+            x, y = (index % width) * tw, (index // width) * th
+            for cy in range(y // self.chunk_height, (y + th - 1) // self.chunk_height + 1):
+                for cx in range(x // self.chunk_width, (x + tw - 1) // self.chunk_width + 1):
+                    self.occupied.add((cx, cy))
+
+    def clear(self):
+        self.chunks.clear()
+        self.memory_used = 0
+
+    def _chunk_rect(self, key):
+        x, y = key[0] * self.chunk_width, key[1] * self.chunk_height
+        return pygame.Rect(x, y, min(self.chunk_width, self.map_width - x), min(self.chunk_height, self.map_height - y))
+
+    def _render_chunk(self, key):
+        rect = self._chunk_rect(key)
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        tw, th = self.tile_width, self.tile_height
+        x0, x1 = rect.left // tw, (rect.right - 1) // tw
+        y0, y1 = rect.top // th, (rect.bottom - 1) // th
+        tile_types = self.tile_types
+        blits = []
+        for width, gids in self.layers:
+            height = len(gids) // width
+            for cy in range(y0, min(y1, height - 1) + 1):
+                row = cy * width
+                for cx in range(x0, min(x1, width - 1) + 1):
+                    gid = gids[row + cx]
+                    if gid: blits.append((tile_types[gid].image, (cx * tw - rect.x, cy * th - rect.y)))
+        surface.fblits(blits)
+        return surface
+
+    def _get_chunk(self, key):
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self._render_chunk(key)
+            self.chunks[key] = surface
+            self.memory_used += surface.get_width() * surface.get_height() * surface.get_bytesize()
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    def _trim(self, keep):
+        while self.memory_used > self.memory_budget and len(self.chunks) > keep:
+            _, surface = self.chunks.popitem(last=False)
+            self.memory_used -= surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def draw(self, surface, camera):
+        view = camera.get_view_rect().clip(pygame.Rect(0, 0, self.map_width, self.map_height))
+        if view.width <= 0 or view.height <= 0: return
+        # Смещение считаем один раз, чтобы чанки стыковались так же, как цельная карта
+        origin_x, origin_y = camera.apply(pygame.Rect(0, 0, 0, 0)).topleft
+        drawn = 0
+        for cy in range(view.top // self.chunk_height, (view.bottom - 1) // self.chunk_height + 1):
+            for cx in range(view.left // self.chunk_width, (view.right - 1) // self.chunk_width + 1):
+                key = (cx, cy)
+                if key not in self.occupied: continue
+                surface.blit(self._get_chunk(key), (origin_x + cx * self.chunk_width, origin_y + cy * self.chunk_height))
+                drawn += 1
+        self._trim(drawn)
+
 class MapLoader:
-    def __init__(self):
+    def __init__(self, rng=None):
         self.obstacles = pygame.sprite.Group()
         self.collectables = pygame.sprite.Group()
         self.platforms = pygame.sprite.Group()
@@ -174,109 +430,94 @@ class MapLoader:
         self.map_width = 0
         self.map_height = 0
         self.tile_properties = {}
-        self.tileset_images = {}
-        self.static_surface = None
-
-    def parse_properties(self, node):
-        properties = {}
-        for prop in node.findall('properties/property'):
-            name, value, prop_type = prop.get('name'), prop.get('value'), prop.get('type')
-            if prop_type == 'bool': properties[name] = value == 'true'
-            elif prop_type == 'int': properties[name] = int(value)
-            elif prop_type == 'float': properties[name] = float(value)
-            else: properties[name] = value
-        return properties
+        self.tile_types = {}
+        self.static_chunks = None
+        self.particles = ParticleSystem(rng)
+        self.obstacle_grid = None
+        self.platform_grid = None
+        self.collectable_grid = None
+        self.falling_grid = None
+        self.healing_grid = None
 
     def load_map(self, map_path):
-        tree = ET.parse(map_path)
-        root = tree.getroot()
-        self.map_width = int(root.get('width')) * int(root.get('tilewidth'))
-        self.map_height = int(root.get('height')) * int(root.get('tileheight'))
-        tilewidth, tileheight = int(root.get('tilewidth')), int(root.get('tileheight'))
-
-        for ts in root.findall('tileset'):
-            firstgid = int(ts.get('firstgid'))
-            tileset_source = ts.get('source')
-            if tileset_source:
-                tileset_path = os.path.join(os.path.dirname(map_path), tileset_source)
-                tileset_tree = ET.parse(tileset_path)
-                tileset_root = tileset_tree.getroot()
-                image_node = tileset_root.find('image')
-                image_path = os.path.join(os.path.dirname(tileset_path), image_node.get('source'))
-                tileset_image = pygame.image.load(image_path).convert_alpha()
-                for tile_node in tileset_root.findall('tile'):
-                    self.tile_properties[firstgid + int(tile_node.get('id'))] = self.parse_properties(tile_node)
-            else:
-                image_node = ts.find('image')
-                image_path = os.path.join(os.path.dirname(map_path), image_node.get('source'))
-                tileset_image = pygame.image.load(image_path).convert_alpha()
+        # Разбор TMX/TSX закэширован в map_cache, здесь только сборка спрайтов
+        data = load_compiled_map(map_path)
+        tilewidth, tileheight = data['tilewidth'], data['tileheight']
+        self.map_width = data['width'] * tilewidth
+        self.map_height = data['height'] * tileheight
+        self.tile_properties.update(data['tile_properties'])
+        # Таблицы по gid из кэша карты: биты свойств и урон
+        self.tile_flags, self.tile_damage = data['tile_flags'], data['tile_damage']
 
+        for firstgid, image_path in data['tilesets']:
+            tileset_image = assets.load(image_path, alpha=True)
             img_w, img_h = tileset_image.get_size()
             for tile_id in range((img_w // tilewidth) * (img_h // tileheight)):
                 gid = firstgid + tile_id
                 x = (tile_id % (img_w // tilewidth)) * tilewidth
                 y = (tile_id // (img_w // tilewidth)) * tileheight
-                self.tileset_images[gid] = tileset_image.subsurface(pygame.Rect(x, y, tilewidth, tileheight))
+                flags = self.tile_flags[gid] if gid < len(self.tile_flags) else 0
+                self.tile_types[gid] = TileType(gid, tileset_image.subsurface(pygame.Rect(x, y, tilewidth, tileheight)), self.tile_properties.get(gid, {}), flags)
         
         for group in [self.obstacles, self.collectables, self.platforms, self.falling_tiles, self.breakable_tiles, self.healing_tiles]: group.empty()
+        self.obstacle_grid = TileGrid(self.map_width, self.map_height, tilewidth, tileheight, self.obstacles)
+        self.platform_grid = TileGrid(self.map_width, self.map_height, tilewidth, tileheight, self.platforms)
+        self.collectable_grid = SpatialHash(group=self.collectables)
+        self.falling_grid = SpatialHash(group=self.falling_tiles)
+        self.healing_grid = SpatialHash(group=self.healing_tiles)
         self.enemies_data = []
 
-        try:
-            self.layer1 = pygame.image.load("Rooms/layer1.png").convert_alpha()
-            self.layer2 = pygame.image.load("Rooms/layer2.png").convert_alpha()
-        except pygame.error:
-            self.layer1 = pygame.Surface((self.map_width, 480), pygame.SRCALPHA)
-            self.layer2 = pygame.Surface((self.map_width, 480), pygame.SRCALPHA)
-
-        static_tiles = []
-        for layer in root.findall('layer'):
-            data_node = layer.find('data')
-            if data_node is not None and data_node.get('encoding') == 'csv' and data_node.text:
-                for y, row in enumerate(data_node.text.strip().split('\n')):
-                    stripped_row = row.strip()
-                    if not stripped_row: continue
-                    for x, gid_str in enumerate(stripped_row.split(',')):
-                        # *** ИСПРАВЛЕНИЕ ЗДЕСЬ ***
-                        # Проверяем, что строка не пустая, прежде чем преобразовывать в int
-                        if gid_str:
-                            gid = int(gid_str)
-                            if gid != 0:
-                                self._process_tile(x, y, gid, tilewidth, tileheight, static_tiles)
-        self._pre_render_static_layers(static_tiles)
-
-    def _process_tile(self, x, y, gid, tw, th, static_tiles):
-        tile_image = self.tileset_images.get(gid)
-        if not tile_image: return
-        props = self.tile_properties.get(gid, {})
+        for x, y, w, h, props, flags in data['colliders']:
+            self.obstacle_grid.add(Collider(pygame.Rect(x * tilewidth, y * tileheight, w * tilewidth, h * tileheight), props, flags))
+
+        empty_layer = lambda: pygame.Surface((self.map_width, 480), pygame.SRCALPHA)
+        self.layer1 = assets.load("Rooms/layer1.png", empty_layer)
+        self.layer2 = assets.load("Rooms/layer2.png", empty_layer)
+
+        # Статичные клетки остаются только gid в массиве слоя, спрайты создаются для тайлов с поведением
+        self.static_chunks = StaticChunkCache(self.map_width, self.map_height, self.tile_types, tilewidth, tileheight)
+        for layer_width, layer_height, gids in data['layers']:
+            static_gids = array('I', bytes(4 * len(gids)))
+            for index, gid in enumerate(gids):
+                if gid != 0 and self._process_tile(index % layer_width, index // layer_width, gid, tilewidth, tileheight):
+                    static_gids[index] = gid
+            self.static_chunks.add_layer(layer_width, static_gids)
+
+    def _process_tile(self, x, y, gid, tw, th):
+        # -> True, если клетка статичная и рисуется из массива слоя
+        tile_type = self.tile_types.get(gid)
+        if not tile_type: return False
+        tile_image, props, flags = tile_type.image, tile_type.properties, tile_type.flags
         wx, wy = x * tw, y * th
 
-        if props.get('player_spawn'): self.player_spawn_pos = (wx, wy)
-        elif props.get('enemy'): self.enemies_data.append({'type': props.get('type'), 'pos': (wx, wy), 'properties': props})
-        elif props.get('collectable'): self.collectables.add(CollectableTile(tile_image, wx, wy))
-        elif props.get('fall'): self.falling_tiles.add(FallingTile(tile_image, wx, wy, props.get('fall_on_stand', True), props.get('fall_on_pass_under', False), props.get('respawn_time', 5.0)))
-        elif props.get('breakable'):
-            new_tile = BreakableTile(tile_image, wx, wy, props)
-            self.breakable_tiles.add(new_tile)
-            if new_tile.collidable: self.obstacles.add(new_tile)
-        elif props.get('healing'): self.healing_tiles.add(HealingTile(tile_image, wx, wy, props))
-        else:
-            new_tile = Tile(tile_image, wx, wy, props)
-            if props.get('collidable'): self.obstacles.add(new_tile)
-            if props.get('platform'): self.platforms.add(PlatformTile(tile_image, wx, wy, props))
-            static_tiles.append(new_tile)
+        if not flags & TILE_SPECIAL:
+            # Обычные стены уже добавлены слитыми коллайдерами, спрайт нужен только стене с уроном
+            if flags & TILE_COLLIDABLE and not is_mergeable(flags): self.obstacle_grid.add(Tile(tile_image, wx, wy, props, flags, self.tile_damage[gid]))
+            if flags & TILE_PLATFORM: self.platform_grid.add(PlatformTile(tile_image, wx, wy, props))
+            return True
 
-    def _pre_render_static_layers(self, static_tiles):
-        self.static_surface = pygame.Surface((self.map_width, self.map_height), pygame.SRCALPHA)
-        for tile in static_tiles:
-            self.static_surface.blit(tile.image, tile.rect)
+        if flags & TILE_PLAYER_SPAWN: self.player_spawn_pos = (wx, wy)
+        elif flags & TILE_ENEMY: self.enemies_data.append({'type': props.get('type'), 'pos': (wx, wy), 'properties': props})
+        elif flags & TILE_COLLECTABLE: self.collectable_grid.add(CollectableTile(tile_image, wx, wy))
+        elif flags & TILE_FALL:
+            new_tile = FallingTile(tile_image, wx, wy, props.get('fall_on_stand', True), props.get('fall_on_pass_under', False), props.get('respawn_time', 5.0))
+            new_tile.grid = self.falling_grid
+            self.falling_grid.add(new_tile)
+        elif flags & TILE_BREAKABLE:
+            new_tile = BreakableTile(tile_image, wx, wy, props, self.particles, flags, self.tile_damage[gid])
+            self.breakable_tiles.add(new_tile)
+            if new_tile.collidable: self.obstacle_grid.add(new_tile)
+        elif flags & TILE_HEALING: self.healing_grid.add(HealingTile(tile_image, wx, wy, props))
+        return False
 
     def draw_static_tiles(self, surface, camera):
-        surface.blit(self.static_surface, camera.apply(self.static_surface.get_rect()))
+        self.static_chunks.draw(surface, camera)
 
     def draw_dynamic_tiles(self, surface, camera):
         for tile in self.falling_tiles:
             if tile.visible: surface.blit(tile.image, camera.apply(tile.rect))
         for tile in self.breakable_tiles: tile.draw(surface, camera)
+        self.particles.draw(surface, camera)
         for coin in self.collectables: surface.blit(coin.image, camera.apply(coin.rect))
         for healing_tile in self.healing_tiles: healing_tile.draw(surface, camera)
 
@@ -1,5 +1,7 @@
 import pygame
-from utils import load_font
+from utils import load_font, draw_overlay
+from assets import assets
+from text_cache import render_text, GlyphAtlas
 
 class UIManager:
     def __init__(self):
@@ -8,6 +10,7 @@ class UIManager:
         self.large_font = load_font("munro.otf", 48)
         self.coin_icon = self._load_coin_icon()
         self.heart_icon = self._load_heart_icon()
+        self.coin_glyphs = GlyphAtlas(self.font, (255, 255, 255))
         self.coins_collected = 0
         self.max_health = 5
         self.player = None
@@ -46,20 +49,32 @@ class UIManager:
         return self.player.current_health if self.player else 0
 
     def _load_coin_icon(self):
-        try:
-            return pygame.image.load("Sprites/coin.png").convert_alpha()
-        except:
-            icon = pygame.Surface((24, 24), pygame.SRCALPHA)
-            pygame.draw.circle(icon, (255, 223, 0), (12, 12), 10)
-            return icon
+        return assets.load("Sprites/coin.png", self._coin_placeholder)
 
     def _load_heart_icon(self):
-        try:
-            return pygame.image.load("Sprites/heart.png").convert_alpha()
-        except:
-            icon = pygame.Surface((24, 24), pygame.SRCALPHA)
-            pygame.draw.polygon(icon, (255, 0, 0), [(12, 0), (23, 8), (19, 23), (5, 23), (0, 8)])
-            return icon
+        return assets.load("Sprites/heart.png", self._heart_placeholder)
+
+    @staticmethod
+    def _coin_placeholder():
+        icon = pygame.Surface((24, 24), pygame.SRCALPHA)
+        pygame.draw.circle(icon, (255, 223, 0), (12, 12), 10)
+        return icon
+
+    @staticmethod
+    def _heart_placeholder():
+        icon = pygame.Surface((24, 24), pygame.SRCALPHA)
+        pygame.draw.polygon(icon, (255, 0, 0), [(12, 0), (23, 8), (19, 23), (5, 23), (0, 8)])
+        return icon
+
+    def reset(self):
+        # Сброс счётчиков без повторной загрузки шрифтов и иконок
+        self.floating_texts.clear()
+        self.coins_collected = 0
+        self.coin_counter_visible = False
+        self.coin_counter_alpha = 0
+        self.coin_counter_timer = 0
+        self.game_over = False
+        self.game_over_alpha = 0
 
     def start_intro(self):
         self.showing_intro = True
@@ -90,36 +105,28 @@ class UIManager:
 
     def draw_intro(self, surface):
         if not self.showing_intro: return
-        overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, self.intro_alpha))
-        surface.blit(overlay, (0, 0))
+        draw_overlay(surface, (0, 0, 0), self.intro_alpha)
         
-        title = self.large_font.render(self.intro_texts[0], True, (255, 255, 255))
-        title.set_alpha(self.intro_alpha)
+        title = render_text(self.large_font, self.intro_texts[0], (255, 255, 255), alpha=self.intro_alpha)
         title_rect = title.get_rect(center=(surface.get_width()//2, surface.get_height()//2 - 50))
         surface.blit(title, title_rect)
         
         for i, line in enumerate(self.intro_texts[1:]):
-            text = self.font.render(line, True, (255, 255, 255))
-            text.set_alpha(self.intro_alpha)
+            text = render_text(self.font, line, (255, 255, 255), alpha=self.intro_alpha)
             text_rect = text.get_rect(center=(surface.get_width()//2, surface.get_height()//2 + 20 + i*30))
             surface.blit(text, text_rect)
         
         if self.show_prompt:
-            prompt = self.font.render("Нажмите ENTER чтобы начать", True, (200, 200, 200))
-            prompt.set_alpha(self.prompt_alpha)
+            prompt = render_text(self.font, "Нажмите ENTER чтобы начать", (200, 200, 200), alpha=self.prompt_alpha)
             prompt_rect = prompt.get_rect(center=(surface.get_width()//2, surface.get_height() - 50))
             surface.blit(prompt, prompt_rect)
 
     def draw_demo_end_screen(self, surface):
         if not self.showing_demo_end: return
-        overlay = pygame.Surface(surface.get_size())
-        overlay.fill((0, 0, 0))
-        surface.blit(overlay, (0, 0))
+        surface.fill((0, 0, 0))
         if self.demo_end_alpha > 0:
             for i, line in enumerate(self.demo_end_texts):
-                text = self.large_font.render(line, True, (255, 255, 255))
-                text.set_alpha(int(self.demo_end_alpha))
+                text = render_text(self.large_font, line, (255, 255, 255), alpha=self.demo_end_alpha)
                 text_rect = text.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2 - 30 + i * 60))
                 surface.blit(text, text_rect)
 
@@ -156,9 +163,7 @@ class UIManager:
             icon = self.coin_icon.copy()
             icon.set_alpha(self.coin_counter_alpha)
             surface.blit(icon, (10, 10))
-            text_surf = self.font.render(f"x {self.coins_collected}", True, (255, 255, 255))
-            text_surf.set_alpha(self.coin_counter_alpha)
-            surface.blit(text_surf, (44, 16))
+            self.coin_glyphs.draw(surface, f"x {self.coins_collected}", (44, 16), self.coin_counter_alpha)
 
         for i in range(self.max_health):
             heart_pos = (surface.get_width() - 30 * (i + 1), 10)
@@ -170,14 +175,12 @@ class UIManager:
                 surface.blit(empty_heart, heart_pos)
 
         if self.game_over:
-            overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, self.game_over_alpha))
-            surface.blit(overlay, (0, 0))
+            draw_overlay(surface, (0, 0, 0), self.game_over_alpha)
             if self.game_over_alpha >= self.game_over_target_alpha:
-                text = self.large_font.render("ПОТРАЧЕНО", True, (255, 50, 50))
+                text = render_text(self.large_font, "ПОТРАЧЕНО", (255, 50, 50))
                 text_rect = text.get_rect(center=(surface.get_width()//2, surface.get_height()//2 - 30))
                 surface.blit(text, text_rect)
-                hint = self.font.render("Нажмите ENTER чтобы начать сначала", True, (255, 255, 255))
+                hint = render_text(self.font, "Нажмите ENTER чтобы начать сначала", (255, 255, 255))
                 hint_rect = hint.get_rect(center=(surface.get_width()//2, surface.get_height()//2 + 30))
                 surface.blit(hint, hint_rect)
 
@@ -187,12 +190,13 @@ class UIManager:
 class FloatingText:
     def __init__(self, text, font, pos, color=(255, 255, 255)):
         self.font = font
+        self.text = text
+        self.color = color
         self.pos = pygame.Vector2(pos)
         self.alpha = 255
         self.lifetime = 1.0
         self.elapsed = 0.0
-        self.image = self.font.render(text, True, color).convert_alpha()
-        self.rect = self.image.get_rect(center=self.pos)
+        self.rect = render_text(self.font, text, color).get_rect(center=self.pos)
 
     def update(self, dt):
         self.elapsed += dt
@@ -201,9 +205,9 @@ class FloatingText:
         else:
             self.pos.y -= 50 * dt
             self.alpha = int(255 * (1 - self.elapsed / self.lifetime))
-            self.image.set_alpha(self.alpha) 
             self.rect.center = self.pos
 
     def draw(self, surface):
+        # Поверхность из общего кэша, поэтому прозрачность выставляется прямо перед отрисовкой
         if self.alpha > 0:
-            surface.blit(self.image, self.rect)
\ No newline at end of file
+            surface.blit(render_text(self.font, self.text, self.color, alpha=self.alpha), self.rect)
\ No newline at end of file
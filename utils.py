@@ -2,6 +2,7 @@
 import os
 import sys
 import pygame
+from assets import assets
 
 def get_resource_path(*path):
     """Получает правильный путь к ресурсам для собранного и несобранного приложения"""
@@ -27,14 +28,44 @@ def load_font(name, size):
             pygame.font.init()
         return pygame.font.SysFont("Arial", size)
 
+def make_alpha_variant(surface, alpha):
+    # Копия с альфой, умноженной прямо в пикселях: блит без per-surface alpha идёт быстрым путём
+    variant = surface.copy()
+    variant.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+    return variant
+
+# Заранее созданные полноэкранные подложки: (размер, цвет) -> поверхность без попиксельной альфы
+_overlay_surfaces = {}
+
+def get_overlay(size, color):
+    key = (tuple(size), tuple(color[:3]))
+    overlay = _overlay_surfaces.get(key)
+    if overlay is None:
+        overlay = pygame.Surface(size)
+        overlay.fill(color[:3])
+        _overlay_surfaces[key] = overlay
+    return overlay
+
+def draw_overlay(surface, color, alpha):
+    # Затемнение/засветка всего экрана без выделения памяти в цикле отрисовки
+    alpha = int(alpha)
+    if alpha <= 0: return
+    if alpha >= 255:
+        surface.fill(color[:3])
+    elif tuple(color[:3]) == (0, 0, 0):
+        # Чёрная подложка с альфой a - то же самое, что умножить RGB на (255 - a) / 255
+        keep = 255 - alpha
+        surface.fill((keep, keep, keep), special_flags=pygame.BLEND_RGB_MULT)
+    else:
+        overlay = get_overlay(surface.get_size(), color)
+        overlay.set_alpha(alpha)
+        surface.blit(overlay, (0, 0))
+
+def _image_placeholder():
+    placeholder = pygame.Surface((132, 86))
+    placeholder.fill((24, 89, 133)) # BLUE
+    pygame.draw.rect(placeholder, (255, 255, 255), (0, 0, 132, 86), 2) # WHITE
+    return placeholder
+
 def load_image(name):
-    try:
-        image_path = get_resource_path("Sprites", name)
-        image = pygame.image.load(image_path)
-        return image
-    except Exception as e:
-        print(f"Не удалось загрузить изображение {name}: {e}")
-        placeholder = pygame.Surface((132, 86))
-        placeholder.fill((24, 89, 133)) # BLUE
-        pygame.draw.rect(placeholder, (255, 255, 255), (0, 0, 132, 86), 2) # WHITE
-        return placeholder
\ No newline at end of file
+    return assets.load(get_resource_path("Sprites", name), _image_placeholder)
\ No newline at end of file
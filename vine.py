@@ -1,16 +1,17 @@
 import pygame
+from assets import assets
+
+def _vine_placeholder():
+    image = pygame.Surface((32, 64), pygame.SRCALPHA)
+    pygame.draw.rect(image, (0, 150, 0), (0, 0, 32, 64))
+    return image
 
 class Vine(pygame.sprite.Sprite):
     def __init__(self, x, y, facing_right):
         super().__init__()
-        try:
-            self.image = pygame.image.load("Sprites/vine.png").convert_alpha()
-        except:
-            self.image = pygame.Surface((32, 64), pygame.SRCALPHA)
-            pygame.draw.rect(self.image, (0, 150, 0), (0, 0, 32, 64))
-        
-        if not facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
+        # Общая поверхность из кэша, отражённая версия тоже готовится один раз
+        if facing_right: self.image = assets.load("Sprites/vine.png", _vine_placeholder)
+        else: self.image = assets.load_flipped("Sprites/vine.png", _vine_placeholder)
         
         self.rect = self.image.get_rect(midbottom=(x, y))
         self.lifetime = 1.0  # Время жизни в секундах